@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:00:00 2026
+
+@author: Felipe
+
+Opt-in profiling of the functions used in the synthetic notebooks.
+enable() replaces the public functions of avo_func, avo_func2, impedance
+and L1_L2_norm by timed wrappers and disable() puts the originals back, so
+nothing runs when the profiling is off. Calls made through the module, e.g.
+avo.shueyrc or L1_L2_norm.l1_norm, are recorded with their count, wall time,
+array shapes and, optionally, the memory allocated (tracemalloc). The cells
+of a notebook (model building, plots) can be timed with the section context
+manager.
+
+    import profiling
+    with profiling.profile():
+        reflect, R0, G = avo.shueyrc(vp, vs, rho, theta1)
+    profiling.dump_json('profile.json')
+    profiling.dump_collapsed('profile.folded') #flamegraph.pl, speedscope
+"""
+
+import functools
+import importlib
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+MODULES = ('avo_func', 'avo_func2', 'impedance', 'L1_L2_norm')
+
+_registry = {}
+_collapsed = {}
+_stack = []
+_originals = {}
+_state = {'enabled': False, 'memory': False, 'modules': MODULES}
+
+def _shapes(args, kwargs):
+    """
+    Shapes of the array arguments of a call, scalars are ().
+    """
+    values = list(args) + list(kwargs.values())
+
+    return(tuple(np.shape(v) for v in values
+                 if isinstance(v, (np.ndarray, float, int, np.generic))))
+
+def _start(name):
+    """
+    Opens the record of a call.
+    """
+    frame = {'name': name, 'child': 0., 'mem0': 0, 'peak': 0}
+    if _state['memory']:
+        current, peak = tracemalloc.get_traced_memory()
+        if _stack:
+            _stack[-1]['peak'] = max(_stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        frame['mem0'] = frame['peak'] = current
+    _stack.append(frame)
+    frame['t0'] = time.perf_counter()
+
+    return(frame)
+
+def _stop(frame, shapes=None):
+    """
+    Closes the record of a call, adding its time and memory to the registry
+    and its self time to the call stack.
+    """
+    elapsed = time.perf_counter() - frame['t0']
+    _stack.pop()
+    nbytes = 0
+    if _state['memory']:
+        peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+        nbytes = peak - frame['mem0']
+        if _stack:
+            _stack[-1]['peak'] = max(_stack[-1]['peak'], peak)
+
+    rec = _registry.setdefault(frame['name'], {
+        'calls': 0, 'time': 0., 'self_time': 0., 'max_time': 0.,
+        'bytes': 0, 'max_bytes': 0, 'shapes': {}})
+    rec['calls'] += 1
+    rec['time'] += elapsed
+    rec['self_time'] += elapsed - frame['child']
+    rec['max_time'] = max(rec['max_time'], elapsed)
+    rec['bytes'] += nbytes
+    rec['max_bytes'] = max(rec['max_bytes'], nbytes)
+    if shapes is not None:
+        key = str(shapes)
+        rec['shapes'][key] = rec['shapes'].get(key, 0) + 1
+
+    path = ';'.join([f['name'] for f in _stack] + [frame['name']])
+    _collapsed[path] = _collapsed.get(path, 0.) + elapsed - frame['child']
+    if _stack:
+        _stack[-1]['child'] += elapsed
+
+def _wrap(func, name):
+    """
+    Timed wrapper of a function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        frame = _start(name)
+        try:
+            return(func(*args, **kwargs))
+        finally:
+            _stop(frame, _shapes(args, kwargs))
+
+    return(wrapper)
+
+def enable(modules=MODULES, memory=False):
+    """
+    Starts the profiling of the public functions of the modules.
+
+    Parameters
+    ----------
+    modules : list
+        Names of the modules. The ones that do not exist in the folder are
+        skipped.
+    memory : bool
+        If True, records the memory allocated by each call with tracemalloc
+        (much slower).
+    """
+    if _state['enabled']:
+        disable()
+    _state['memory'] = memory
+    _state['modules'] = tuple(modules)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _state['tracemalloc'] = True
+
+    for mod_name in modules:
+        try:
+            mod = importlib.import_module(mod_name)
+        except ImportError:
+            continue
+        for name, obj in list(vars(mod).items()):
+            if name.startswith('_') or not callable(obj) or \
+               getattr(obj, '__module__', None) != mod.__name__:
+                continue
+            _originals[(mod, name)] = obj
+            setattr(mod, name, _wrap(obj, mod_name+'.'+name))
+    _state['enabled'] = True
+
+def disable():
+    """
+    Stops the profiling and restores the original functions. The records
+    are kept until reset().
+    """
+    for (mod, name), obj in _originals.items():
+        setattr(mod, name, obj)
+    _originals.clear()
+    if _state.pop('tracemalloc', False):
+        tracemalloc.stop()
+    _state['enabled'] = False
+    _state['memory'] = False
+
+def reset():
+    """
+    Clears the records.
+    """
+    _registry.clear()
+    _collapsed.clear()
+
+def settings():
+    """
+    Arguments of enable() of the current profiling, e.g. for the
+    initializer of a process pool. None when the profiling is off.
+    """
+    if not _state['enabled']:
+        return(None)
+
+    return((_state['modules'], _state['memory']))
+
+def records():
+    """
+    Copy of the records of this process, to send them to another one.
+    """
+    return({'stats': stats(), 'collapsed': dict(_collapsed)})
+
+def merge(other):
+    """
+    Adds the records of another process (from records()) to this one.
+    """
+    for name, new in other['stats'].items():
+        rec = _registry.setdefault(name, {
+            'calls': 0, 'time': 0., 'self_time': 0., 'max_time': 0.,
+            'bytes': 0, 'max_bytes': 0, 'shapes': {}})
+        for key in ('calls', 'time', 'self_time', 'bytes'):
+            rec[key] += new[key]
+        for key in ('max_time', 'max_bytes'):
+            rec[key] = max(rec[key], new[key])
+        for key, count in new['shapes'].items():
+            rec['shapes'][key] = rec['shapes'].get(key, 0) + count
+    for path, value in other['collapsed'].items():
+        _collapsed[path] = _collapsed.get(path, 0.) + value
+
+@contextmanager
+def profile(modules=MODULES, memory=False):
+    """
+    Profiles the functions of the modules inside a with block.
+    """
+    enable(modules, memory)
+    try:
+        yield _registry
+    finally:
+        disable()
+
+@contextmanager
+def section(name):
+    """
+    Times a block of code, e.g. the reading of a LAS file. Does nothing when
+    the profiling is not enabled.
+    """
+    if not _state['enabled']:
+        yield
+        return
+    frame = _start(name)
+    try:
+        yield
+    finally:
+        _stop(frame)
+
+def stats():
+    """
+    Records of each function: 'calls', 'time', 'self_time' (without the
+    profiled functions it calls), 'max_time' (s), 'bytes', 'max_bytes' and
+    the number of calls with each shape of the array arguments.
+    """
+    return({name: dict(rec, shapes=dict(rec['shapes']))
+            for name, rec in _registry.items()})
+
+def dump_json(path=None):
+    """
+    Writes the records to a JSON file, sorted by total time.
+
+    Parameters
+    ----------
+    path : str
+        Output file. If None, only returns the text.
+
+    Returns
+    -------
+    text : str
+        JSON text.
+    """
+    records = sorted(stats().items(), key=lambda x: -x[1]['time'])
+    text = json.dumps(dict(records), indent=1)
+    if path is not None:
+        with open(path, 'w') as f:
+            f.write(text)
+
+    return(text)
+
+def dump_collapsed(path=None):
+    """
+    Writes the self time (microseconds) of each call stack in the collapsed
+    format of flamegraph.pl and speedscope ("a;b;c 1234" per line).
+
+    Parameters
+    ----------
+    path : str
+        Output file. If None, only returns the text.
+
+    Returns
+    -------
+    text : str
+        Collapsed stacks.
+    """
+    text = ''.join('{0} {1}\n'.format(k, int(round(v*1e6)))
+                   for k, v in sorted(_collapsed.items()))
+    if path is not None:
+        with open(path, 'w') as f:
+            f.write(text)
+
+    return(text)
@@ -7,7 +7,7 @@ Created on Tue Apr 21 17:26:40 2020
 
 @author: Felipe
 
-Approximations of Aki and Richard and Shuey
+Approximations of Aki and Richard, Shuey and Ruger (VTI)
 """
 
 import numpy as np
@@ -139,6 +139,256 @@ def shuey(vp1, vs1, rho1, vp2, vs2, rho2, theta1):
     
     return (R0,G,R2, R3)
 
+def ruger(vp1, vs1, rho1, delta1, epsilon1, vp2, vs2, rho2, delta2,
+          epsilon2, theta1):
+    """
+    Computes the P-wave reflectivity with Ruger (1997) for a two-layered
+    model of VTI (transversely isotropic with vertical axis) media, with the
+    Thomsen parameters delta and epsilon. With zero delta and epsilon it is
+    Shuey (1985) 3 terms (tan**2 - sin**2 = sin**2*tan**2).
+    Ruger, A., 1997, P-wave reflection coefficients for transversely
+    isotropic models with vertical and horizontal axis of symmetry,
+    Geophysics, 62 (3), 713-722.
+    
+    Parameters
+    ----------
+    vp1 : array
+        Vertical P-wave in the upper layer.
+    vs1 : array
+        Vertical S-wave in the upper layer.
+    rho1 : array
+        Density in the upper layer.
+    delta1 : array
+        Thomsen delta in the upper layer.
+    epsilon1 : array
+        Thomsen epsilon in the upper layer.
+    vp2 : array
+        Vertical P-wave in the lower layer.
+    vs2 : array
+        Vertical S-wave in the lower layer.
+    rho2 : array
+        Density in the lower layer.
+    delta2 : array
+        Thomsen delta in the lower layer.
+    epsilon2 : array
+        Thomsen epsilon in the lower layer.
+    theta1 : array
+        Angles of incidence.
+
+    Returns
+    -------
+    R0 : array
+        Intercept.
+    G : array
+        Anisotropic gradient.
+    C : array
+        Curvature (sin**2*tan**2 term).
+    R : array
+        Reflection coefficient.
+    """
+    
+    theta1 = np.radians(theta1)
+    
+    dvp = vp2-vp1
+    dvs = vs2-vs1
+    drho = rho2-rho1
+    vp  = (vp1+vp2)/2
+    vs  = (vs1+vs2)/2
+    rho = (rho1+rho2)/2
+    
+    R0, G, C = _ruger_terms(dvp, dvs, drho, vp, vs, rho, delta2-delta1,
+                            epsilon2-epsilon1)
+    
+    R = R0 + G*np.sin(theta1)**2 + C*np.sin(theta1)**2*np.tan(theta1)**2
+    
+    return (R0, G, C, R)
+
+def _ruger_terms(dvp, dvs, drho, vp, vs, rho, ddelta, depsilon):
+    """
+    Intercept, gradient and curvature of Ruger (1997) from the contrasts
+    and means across the interfaces.
+    """
+    R0 = 0.5 * (dvp/vp + drho/rho)
+    G = 0.5 * (dvp/vp + ddelta) - 2 * (vs**2/vp**2) * (drho/rho + 2*dvs/vs)
+    C = 0.5 * (dvp/vp + depsilon)
+    
+    return (R0, G, C)
+
+def _layer_jacobian(dx, xm):
+    """
+    Derivatives with respect to the upper and lower layer properties from
+    the derivatives with respect to the contrast (dx = x2 - x1) and the
+    mean (xm = (x1 + x2)/2).
+    """
+    return(-dx + 0.5*xm, dx + 0.5*xm)
+
+def shuey_jacobian(vp1, vs1, rho1, vp2, vs2, rho2, theta1, contrasts=False):
+    """
+    Computes the analytic partial derivatives of the Shuey (1985) 2 terms
+    reflectivity (R2 of shuey, the reflectivity of shueyrc) for every
+    interface and angle, with the angles of incidence fixed.
+    
+    Parameters
+    ----------
+    vp1 : array
+        P-wave in the upper layer.
+    vs1 : array
+        S-wave in the upper layer.
+    rho1 : array
+        Density in the upper layer.        
+    vp2 : array
+        P-wave in the lower layer.        
+    vs2 : array
+        S-wave in the lower layer.      
+    rho2 : array
+        Density in the lower layer.        
+    theta1 : array
+        Angles of incidence.
+    contrasts : bool
+        If True, the derivatives are with respect to the contrasts and the
+        means (dvp, dvs, drho, vp, vs, rho), otherwise with respect to
+        (vp1, vs1, rho1, vp2, vs2, rho2).
+
+    Returns
+    -------
+    J : array
+        Derivatives (6 x interfaces x angles), one block for each
+        parameter. J[:, i].T (angles x 6) is the matrix of the linearized
+        problem of the interface i, e.g. for L1_L2_norm.
+    """
+    
+    s2 = np.sin(np.radians(theta1))**2
+    vp1, vs1, rho1, vp2, vs2, rho2 = (np.asarray(x)[..., None] for x in
+                                      (vp1, vs1, rho1, vp2, vs2, rho2))
+    
+    dvp = vp2-vp1
+    dvs = vs2-vs1
+    drho = rho2-rho1
+    vp  = (vp1+vp2)/2
+    vs  = (vs1+vs2)/2
+    rho = (rho1+rho2)/2
+    k = vs**2/vp**2
+    
+    d_dvp = 0.5*(1 + s2)/vp
+    d_dvs = -4*k*s2/vs
+    d_drho = (0.5 - 2*k*s2)/rho
+    d_vp = -0.5*(1 + s2)*dvp/vp**2 + 4*s2*k/vp*(drho/rho + 2*dvs/vs)
+    d_vs = -4*s2*(vs*drho/rho + dvs)/vp**2
+    d_rho = -(0.5 - 2*k*s2)*drho/rho**2
+    
+    J = np.broadcast_arrays(d_dvp, d_dvs, d_drho, d_vp, d_vs, d_rho)
+    if not contrasts:
+        (d_vp1, d_vp2), (d_vs1, d_vs2), (d_rho1, d_rho2) = \
+            [_layer_jacobian(J[i], J[i+3]) for i in range(3)]
+        J = [d_vp1, d_vs1, d_rho1, d_vp2, d_vs2, d_rho2]
+    
+    return(np.array(J))
+
+def akirichards_jacobian(vp1, vs1, rho1, vp2, vs2, rho2, theta1,
+                         contrasts=False):
+    """
+    Computes the analytic partial derivatives of the Aki and Richard's (1980)
+    reflectivity of akirichards for every interface and angle, with the
+    angles of incidence fixed (the ray parameter and the angle of refraction
+    change with the velocities, as in snell).
+    
+    Parameters
+    ----------
+    vp1 : array
+        P-wave in the upper layer.
+    vs1 : array
+        S-wave in the upper layer.
+    rho1 : array
+        Density in the upper layer.        
+    vp2 : array
+        P-wave in the lower layer.        
+    vs2 : array
+        S-wave in the lower layer.      
+    rho2 : array
+        Density in the lower layer.        
+    theta1 : array
+        Angles of incidence.
+    contrasts : bool
+        If True, the derivatives are with respect to the contrasts and the
+        means (dvp, dvs, drho, vp, vs, rho), otherwise with respect to
+        (vp1, vs1, rho1, vp2, vs2, rho2).
+
+    Returns
+    -------
+    J : array
+        Derivatives (6 x interfaces x angles), one block for each
+        parameter. NaN after the critical angle.
+    """
+    
+    theta1 = np.radians(theta1)
+    vp1, vs1, rho1, vp2, vs2, rho2 = (np.asarray(x)[..., None] for x in
+                                      (vp1, vs1, rho1, vp2, vs2, rho2))
+    theta2, p = snell(vp1, vp2, theta1)
+    theta = (theta1 + theta2) / 2.
+    
+    dvp = vp2-vp1
+    dvs = vs2-vs1
+    drho = rho2-rho1
+    vp  = (vp1+vp2)/2
+    vs  = (vs1+vs2)/2
+    rho = (rho1+rho2)/2
+    cos2 = np.cos(theta)**2
+    
+    #partial derivatives of R1, R2 and R3 of akirichards
+    R1_p = -4*p*vs**2*drho/rho
+    R1_vs = -4*p**2*vs*drho/rho
+    R1_drho = 0.5*(1-4*p**2*vs**2)/rho
+    R1_rho = -R1_drho*drho/rho
+    R2_dvp = 0.5/(cos2*vp)
+    R2_vp = -R2_dvp*dvp/vp
+    R2_theta = dvp*np.tan(theta)/(cos2*vp)
+    R3_p = 8*p*vs*dvs
+    R3_vs = 4*p**2*dvs
+    R3_dvs = 4*p**2*vs
+    
+    #derivatives of the ray parameter and of theta with the velocities
+    p_vp1 = -p/vp1
+    theta_vp1 = 0.5*vp2*p_vp1/np.cos(theta2)
+    theta_vp2 = 0.5*p/np.cos(theta2)
+    
+    d_vp1 = (R1_p - R3_p)*p_vp1 - R2_dvp + 0.5*R2_vp + R2_theta*theta_vp1
+    d_vp2 = R2_dvp + 0.5*R2_vp + R2_theta*theta_vp2
+    d_vs1, d_vs2 = _layer_jacobian(-R3_dvs, R1_vs - R3_vs)
+    d_rho1, d_rho2 = _layer_jacobian(R1_drho, R1_rho)
+    
+    J = np.broadcast_arrays(d_vp1, d_vs1, d_rho1, d_vp2, d_vs2, d_rho2)
+    if contrasts:
+        J = [0.5*(J[i+3] - J[i]) for i in range(3)] + \
+            [J[i] + J[i+3] for i in range(3)]
+    
+    return(np.array(J))
+
+def _contrast(x0):
+    """
+    Contrast and mean of a log across the interfaces between consecutive
+    samples. Row i is the interface between the samples i-1 and i, and the
+    first row repeats the second, as in shueyrc.
+    
+    Parameters
+    ----------
+    x0 : array
+        Log (samples).
+
+    Returns
+    -------
+    dx : array
+        Contrast, x[i] - x[i-1].
+    x : array
+        Mean, (x[i] + x[i-1])/2.
+    """
+    dx = x0[1:]-x0[:-1]
+    x = (x0[1:]+x0[:-1])/2.0
+    #insert in the first position
+    dx = np.insert(dx,0,dx[0])
+    x = np.insert(x,0,x[0])
+    
+    return(dx, x)
+
 def shueyrc(vp0, vs0, rho0, theta1):
     """
     Computes the P-wave reflectivity with Shuey (1985) 2 terms for a 
@@ -168,21 +418,9 @@ def shueyrc(vp0, vs0, rho0, theta1):
     
     theta1 = np.radians(theta1)
     
-    dvp=vp0[1:]-vp0[:-1]
-    dvs=vs0[1:]-vs0[:-1]
-    drho=rho0[1:]-rho0[:-1]
-    #insert in the first position    
-    drho=np.insert(drho,0,drho[0]) 
-    dvp=np.insert(dvp,0,dvp[0])    
-    dvs=np.insert(dvs,0,dvs[0])     
-
-    vp=(vp0[1:]+vp0[:-1])/2.0
-    vs=(vs0[1:]+vs0[:-1])/2.0    
-    rho=(rho0[1:]+rho0[:-1])/2.0
-
-    vp=np.insert(vp,0,vp[0])
-    vs=np.insert(vs,0,vs[0])    
-    rho=np.insert(rho,0,rho[0])
+    dvp, vp = _contrast(vp0)
+    dvs, vs = _contrast(vs0)
+    drho, rho = _contrast(rho0)
 
     # Compute two-term reflectivity
     R0 = 0.5 * (dvp/vp + drho/rho)
@@ -194,6 +432,54 @@ def shueyrc(vp0, vs0, rho0, theta1):
     R = term1 + term2 
     return (R,R0,G)
 
+def rugerrc(vp0, vs0, rho0, delta0, epsilon0, theta1):
+    """
+    Computes the P-wave reflectivity with Ruger (1997) for a VTI log, with
+    the same interfaces of shueyrc (row i is the interface between the
+    samples i-1 and i). All the samples and angles at once.
+    
+    Parameters
+    ----------
+    vp0 : array
+        Vertical P-wave.
+    vs0 : array
+        Vertical S-wave.
+    rho0 : array
+        Density.
+    delta0 : array
+        Thomsen delta.
+    epsilon0 : array
+        Thomsen epsilon.
+    theta1 : array
+        Angles of incidence.
+
+    Returns
+    -------
+    R : array
+        Reflection coefficient (samples x angles).
+    R0 : array
+        Intercept.
+    G : array
+        Anisotropic gradient.
+    C : array
+        Curvature (sin**2*tan**2 term).
+    """
+    
+    theta1 = np.radians(theta1)
+    
+    dvp, vp = _contrast(vp0)
+    dvs, vs = _contrast(vs0)
+    drho, rho = _contrast(rho0)
+    ddelta, _ = _contrast(np.broadcast_to(delta0, np.shape(vp0)))
+    depsilon, _ = _contrast(np.broadcast_to(epsilon0, np.shape(vp0)))
+    
+    R0, G, C = _ruger_terms(dvp, dvs, drho, vp, vs, rho, ddelta, depsilon)
+    
+    s2 = np.sin(theta1)**2
+    R = np.outer(R0,1) + np.outer(G, s2) + np.outer(C, s2*np.tan(theta1)**2)
+    
+    return (R, R0, G, C)
+
 def rickerwave(f = 25, length = 0.512, dt = 0.004):
     """
     Computes the ricker wavelet.
@@ -237,3 +523,48 @@ def reflect_coef(ip):
     rc=np.append(rc,rc[-1])
     
     return(rc)
+
+def anglegather(reflect, wavelet):
+    """
+    Computes the angle gather convolving the wavelet with the reflectivity
+    of every angle at once. Same output as np.convolve(wavelet, reflect[:,i],
+    mode='same') for each column, but done with a single FFT along the 
+    samples. Non-finite coefficients (e.g. nulls of the LAS logs) are
+    convolved as zeros and stay NaN in the gather, instead of spreading
+    to the whole trace.
+    
+    Parameters
+    ----------
+    reflect : 2D array
+       Reflection coefficients (samples x angles).
+    wavelet : array
+        Amplitude of the wavelet.
+
+    Returns
+    -------
+    gather : 2D array
+        Angle gather (samples x angles).
+    """ 
+    reflect = np.asarray(reflect)
+    wavelet = np.asarray(wavelet)
+    bad = ~np.isfinite(reflect)
+    if bad.any():
+        reflect = np.where(bad, 0., reflect)
+    ns = reflect.shape[0]
+    nw = wavelet.size
+    nfft = ns + nw - 1
+    
+    spec = np.fft.rfft(reflect, nfft, axis=0)
+    spec *= np.fft.rfft(wavelet, nfft).reshape((-1,) + (1,)*(reflect.ndim-1))
+    full = np.fft.irfft(spec, nfft, axis=0)
+    
+    #same centering as np.convolve mode='same'
+    nout = max(ns, nw)
+    start = (min(ns, nw)-1)//2
+    gather = full[start:start+nout]
+    if bad.any():
+        #output sample of each input sample
+        shift = (nw-1)//2 - start
+        gather[shift:shift+ns][bad] = np.nan
+    
+    return(gather)
@@ -69,6 +69,47 @@ def gassmann(vp1,vs1,rho1,phi,k0,k_f1,rho_f1,k_f2,rho_f2):
     
     return(vp2,vs2,rho2)
 
+def gassmann_dry(kdry,mudry,phi,k0,rho0,k_f,rho_f):
+    """
+    Computes elastic properties (Vp, Vs and density) of a rock saturated 
+    with a fluid from the dry-rock moduli, with Gassmann's equation.
+    
+    Avseth et al., Quantitative seismic interpretation, 2006, Page 169.
+    
+    Parameters
+    ----------
+    kdry : float or array
+        Dry-rock bulk modulus - GPa
+    mudry : float or array
+        Dry-rock shear modulus - GPa
+    phi : float or array
+        Porosity in fraction. 
+    k0 : float or array
+        Mineral bulk modulus - GPa
+    rho0 : float or array
+        Mineral density - g/cm3
+    k_f : float or array
+        Fluid bulk modulus - GPa
+    rho_f : float or array
+        Fluid density - g/cm3
+
+    Returns
+    -------
+    vp : float or array
+        Saturated P-wave velocity - m/s
+    vs : float or array
+        Saturated S-wave velocity - m/s.        
+    rho : float or array
+        Saturated density - g/cm3.
+    """
+    k_sat = kdry+(1- (kdry/k0))**2 /((phi/k_f) \
+            + ((1-phi)/k0) - (kdry/k0**2))
+    rho = (1-phi)*rho0+phi*rho_f
+    vp = np.sqrt((k_sat+(4/3)*mudry)/rho)*1000 #m/s
+    vs = np.sqrt(mudry/rho)*1000 #m/s
+    
+    return(vp,vs,rho)
+
 def vrh(volumes,k,mu):
     #modified from https://github.com/seg/tutorials-2015/blob/master/1506_Seismic_petrophysics_2/Seismic_petrophysics_2.ipynb
     f = np.array(volumes).T
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:05:00 2026
+
+@author: Felipe
+
+Backus (1962) averaging of the logs to the seismic scale. The moving
+averages of the window are differences of cumulative sums, so the cost does
+not depend on the window length, and the upscaled logs are decimated to a
+coarser sample rate before avo.shueyrc (or avo.rugerrc with the Thomsen
+parameters of the layering).
+Mavko et al., The rock physics handbook, 2009, Pages 210-213.
+"""
+
+import numpy as np
+
+def moving_average(x, n):
+    """
+    Centered moving average over n samples with cumulative sums. NaN
+    samples are left out of the average and the window is shortened at the
+    ends of the log.
+
+    Parameters
+    ----------
+    x : array
+        Log (samples).
+    n : integer
+        Length of the window in samples.
+
+    Returns
+    -------
+    avg : array
+        Moving average, NaN where the window has no valid sample.
+    """
+    x = np.asarray(x, dtype=float)
+    valid = np.isfinite(x)
+    cs = np.concatenate([[0.], np.cumsum(np.where(valid, x, 0.))])
+    cn = np.concatenate([[0], np.cumsum(valid)])
+
+    i = np.arange(x.size)
+    lo = np.clip(i - n//2, 0, x.size)
+    hi = np.clip(i - n//2 + n, 0, x.size)
+    count = cn[hi] - cn[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg = np.where(count > 0, (cs[hi] - cs[lo])/count, np.nan)
+
+    return(avg)
+
+def backus(vp, vs, rho, n):
+    """
+    Computes the Backus average of isotropic layers in a moving window: the
+    vertical velocities, density and Thomsen parameters of the equivalent
+    VTI medium.
+
+    Parameters
+    ----------
+    vp : array
+        P-velocity.
+    vs : array
+        S-velocity.
+    rho : array
+        Density.
+    n : integer
+        Length of the window in samples.
+
+    Returns
+    -------
+    vp0 : array
+        Vertical P-velocity.
+    vs0 : array
+        Vertical S-velocity.
+    rho0 : array
+        Density.
+    epsilon : array
+        Thomsen epsilon.
+    delta : array
+        Thomsen delta.
+    """
+    vp, vs, rho = (np.asarray(a, dtype=float) for a in (vp, vs, rho))
+    mu = rho*vs**2
+    m = rho*vp**2 #lambda + 2*mu
+    lam = m - 2*mu
+    #the samples missing in any log are left out of all the averages
+    bad = ~(np.isfinite(m) & np.isfinite(mu))
+    avg = lambda x: moving_average(np.where(bad, np.nan, x), n)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        c33 = 1/avg(1/m)
+        c44 = 1/avg(1/mu)
+        c13 = c33*avg(lam/m)
+        c11 = avg(4*mu*(lam + mu)/m) + c33*avg(lam/m)**2
+        rho0 = avg(rho)
+
+        vp0 = np.sqrt(c33/rho0)
+        vs0 = np.sqrt(c44/rho0)
+        epsilon = (c11 - c33)/(2*c33)
+        delta = ((c13 + c44)**2 - (c33 - c44)**2)/(2*c33*(c33 - c44))
+
+    return(vp0, vs0, rho0, epsilon, delta)
+
+def upscale(depth, vp, vs, rho, length, dz):
+    """
+    Backus average in a window of the given length and decimation of the
+    logs to a new sample rate.
+
+    Parameters
+    ----------
+    depth : array
+        Depth of the logs (regular sampling) - m
+    vp : array
+        P-velocity.
+    vs : array
+        S-velocity.
+    rho : array
+        Density.
+    length : float
+        Length of the Backus window - m. A common choice is a quarter of
+        the shortest wavelength, e.g. vp/(4*fmax).
+    dz : float
+        Sample rate of the output - m
+
+    Returns
+    -------
+    depth2 : array
+        Depth of the upscaled logs.
+    vp2 : array
+        Vertical P-velocity.
+    vs2 : array
+        Vertical S-velocity.
+    rho2 : array
+        Density.
+    epsilon : array
+        Thomsen epsilon.
+    delta : array
+        Thomsen delta.
+    """
+    depth = np.asarray(depth, dtype=float)
+    step = (depth[-1] - depth[0])/(depth.size - 1)
+    n = max(int(round(length/step)), 1)
+    logs = backus(vp, vs, rho, n)
+
+    #the average is already smooth at the scale of the window
+    depth2 = np.arange(depth[0], depth[-1] + step/2., dz)
+    pos = (depth2 - depth[0])/step
+    i0 = np.minimum(np.floor(pos).astype(int), depth.size-2)
+    w = pos - i0
+    out = [(1-w)*x[i0] + w*x[i0+1] for x in logs]
+
+    return((depth2,) + tuple(out))
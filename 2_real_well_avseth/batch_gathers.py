@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:30:00 2026
+
+@author: Felipe
+
+Batch runner for the well to angle gather workflow of 1_well_2_avseth.ipynb:
+Gassmann fluid substitution -> Shuey reflectivity -> convolution, for many
+LAS files at once in a process pool.
+
+Usage:
+    python batch_gathers.py "well_*.las" config.json -o gathers -j 4
+
+Example of config (JSON or YAML, any key can be omitted to use the default):
+    {"curves": {"depth": "DEPT", "vp": "Vp", "vs": "Vs", "rho": "RHOB",
+                "gr": "GR", "sw": "SW"},
+     "velocity_scale": 1000,
+     "fluids": {"rho_b": 1.09, "k_b": 2.8, "rho_o": 0.78, "k_o": 0.94},
+     "minerals": {"rho_qz": 2.65, "k_qz": 36.8, "mu_qz": 44,
+                  "rho_sh": 2.81, "k_sh": 15, "mu_sh": 5},
+     "sw": 1.0,
+     "tops": {"well_2": {"top": 2153, "base": 2183}},
+     "window": {"well_2": {"top": 2130, "base": 2210}},
+     "angles": {"start": 0, "stop": 31, "step": 1},
+     "wavelet": {"f": 25, "length": 0.15, "dt": 0.001}}
+
+For every well a <well>.npz is written in the output folder with the depth,
+the logs of each scenario (input, brine and oil), the intercept, gradient,
+Vp/Vs, acoustic impedance and the angle gathers (scenario x depth x angle).
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import avo_func as avo
+import avo_func2 as avo2
+import profiling
+
+DEFAULTS = {
+    'curves': {'depth': 'DEPT', 'vp': 'Vp', 'vs': 'Vs', 'rho': 'RHOB',
+               'gr': 'GR', 'sw': None},
+    'velocity_scale': 1000.,
+    #parameters from Avseth et al. (2001) and Avseth et al. (2005)
+    'fluids': {'rho_b': 1.09, 'k_b': 2.8, 'rho_o': 0.78, 'k_o': 0.94},
+    'minerals': {'rho_qz': 2.65, 'k_qz': 36.8, 'mu_qz': 44.,
+                 'rho_sh': 2.81, 'k_sh': 15., 'mu_sh': 5.},
+    #water saturation where the well has no sw curve (or it is null)
+    'sw': 1.0,
+    'tops': {},
+    'window': {},
+    'angles': {'start': 0, 'stop': 31, 'step': 1},
+    'wavelet': {'f': 25, 'length': 0.150, 'dt': 0.001},
+}
+
+SCENARIOS = ('input', 'brine', 'oil')
+
+def load_config(path=None):
+    """
+    Reads the configuration file (JSON or YAML) and fills the missing keys
+    with the defaults.
+
+    Parameters
+    ----------
+    path : str
+        Path of the configuration file. If None, only the defaults are used.
+
+    Returns
+    -------
+    config : dict
+        Configuration.
+    """
+    user = {}
+    if path is not None:
+        with open(path) as f:
+            if path.lower().endswith(('.yml', '.yaml')):
+                import yaml
+                user = yaml.safe_load(f) or {}
+            else:
+                user = json.load(f)
+
+    config = {}
+    for key, value in DEFAULTS.items():
+        if isinstance(value, dict):
+            config[key] = dict(value)
+            config[key].update(user.get(key, {}))
+        else:
+            config[key] = user.get(key, value)
+
+    return(config)
+
+def read_well(path, config):
+    """
+    Reads the curves of a LAS file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the LAS file.
+    config : dict
+        Configuration from load_config.
+
+    Returns
+    -------
+    logs : dict
+        Depth, vp (m/s), vs (m/s), rho (g/cc), gr, vsh and sw (fraction).
+        Vs and sw are None when the well does not have the curves. The clay
+        content vsh is normalized with the GR range of the whole log, as in
+        the notebook, so it does not change with the window.
+    """
+    import las
+
+    well = las.LASReader(path, null_subs=np.nan)
+    names = well.data.dtype.names
+    curves = config['curves']
+    scale = config['velocity_scale']
+
+    logs = {'depth': well.data[curves['depth']],
+            'vp': well.data[curves['vp']]*scale,
+            'rho': well.data[curves['rho']],
+            'gr': well.data[curves['gr']],
+            'vs': None, 'sw': None}
+    #clay content (%) = (GR - GRmin)/(GRmax - GRmin)
+    gr = logs['gr']
+    logs['vsh'] = (gr-np.nanmin(gr))/(np.nanmax(gr)-np.nanmin(gr))
+    if curves['vs'] in names:
+        logs['vs'] = well.data[curves['vs']]*scale
+    if curves.get('sw') in names:
+        logs['sw'] = well.data[curves['sw']]
+
+    return(logs)
+
+def fluid_substitution(logs, config, top, base):
+    """
+    Gassmann substitution to brine and oil inside the reservoir, as in
+    1_well_2_avseth.ipynb.
+
+    Parameters
+    ----------
+    logs : dict
+        Logs from read_well.
+    config : dict
+        Configuration from load_config.
+    top : integer
+        Index of the top of the reservoir.
+    base : integer
+        Index of the base of the reservoir.
+
+    Returns
+    -------
+    scenarios : dict
+        (vp, vs, rho) for each scenario in SCENARIOS.
+    """
+    fl = config['fluids']
+    mn = config['minerals']
+    vp, vs, rho, vsh = logs['vp'], logs['vs'], logs['rho'], logs['vsh']
+
+    sw = np.full_like(vp, config['sw'])
+    if logs.get('sw') is not None:
+        sw = np.where(np.isfinite(logs['sw']), logs['sw'], sw)
+
+    rhom = vsh*mn['rho_sh'] + (1-vsh)*mn['rho_qz']
+    rhof = sw*fl['rho_b'] + (1-sw)*fl['rho_o']
+    phi = (rhom-rho)/(rhom-rhof)
+
+    sand = 1 - vsh - phi
+    vsh_N = vsh/(vsh+sand)
+    sand_N = sand/(vsh+sand)
+
+    _, _, _, _, k0, _ = avo2.vrh([vsh_N, sand_N], [mn['k_sh'], mn['k_qz']],
+                                 [mn['mu_sh'], mn['mu_qz']])
+    #Reuss average of the fluids, the shear moduli are zero
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _, k_fl, _, _, _, _ = avo2.vrh([sw, 1-sw], [fl['k_b'], fl['k_o']],
+                                       [0, 0])
+
+    scenarios = {'input': (vp, vs, rho)}
+    for name, k_f2, rho_f2 in (('brine', fl['k_b'], fl['rho_b']),
+                               ('oil', fl['k_o'], fl['rho_o'])):
+        out = avo2.gassmann(vp, vs, rho, phi, k0, k_fl, rhof, k_f2, rho_f2)
+        new = []
+        for log, sub in zip((vp, vs, rho), out):
+            log = np.copy(log)
+            log[top:base] = sub[top:base]
+            new.append(log)
+        scenarios[name] = tuple(new)
+
+    return(scenarios)
+
+def process_well(path, config, outdir):
+    """
+    Runs the full workflow for a single well and writes <well>.npz.
+
+    Parameters
+    ----------
+    path : str
+        Path of the LAS file.
+    config : dict
+        Configuration from load_config.
+    outdir : str
+        Output folder.
+
+    Returns
+    -------
+    message : str
+        Summary of the run.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    with profiling.section('read_well'):
+        logs = read_well(path, config)
+    if logs['vs'] is None:
+        return('%s: skipped, no %s curve' % (name, config['curves']['vs']))
+
+    z = logs['depth']
+    window = config['window'].get(name)
+    if window is not None:
+        i0 = (np.abs(z - window['top'])).argmin()
+        i1 = (np.abs(z - window['base'])).argmin()
+        logs = {k: (v[i0:i1] if v is not None else v) for k, v in logs.items()}
+        z = logs['depth']
+
+    tops = config['tops'].get(name)
+    if tops is not None:
+        top = (np.abs(z - tops['top'])).argmin()
+        base = (np.abs(z - tops['base'])).argmin()
+        scenarios = fluid_substitution(logs, config, top, base)
+    else:
+        scenarios = {'input': (logs['vp'], logs['vs'], logs['rho'])}
+
+    ang = config['angles']
+    angle = np.arange(ang['start'], ang['stop'], ang['step'])
+    wav = config['wavelet']
+    _, wavelet = avo.rickerwave(wav['f'], wav['length'], wav['dt'])
+
+    out = {'depth': z, 'angle': angle, 'wavelet': wavelet,
+           'scenarios': np.array(list(scenarios))}
+    gathers = []
+    for key, (vp, vs, rho) in scenarios.items():
+        reflect, r0, g = avo.shueyrc(vp, vs, rho, angle)
+        gathers.append(avo.anglegather(reflect, wavelet))
+        out['vp_'+key] = vp
+        out['vs_'+key] = vs
+        out['rho_'+key] = rho
+        out['intercept_'+key] = r0
+        out['gradient_'+key] = g
+        out['vpvs_'+key] = vp/vs
+        out['ai_'+key] = avo2.ai(vp, rho)
+    out['gathers'] = np.asarray(gathers)
+
+    with profiling.section('savez'):
+        np.savez(os.path.join(outdir, name+'.npz'), **out)
+
+    return('%s: %d samples, scenarios %s' % (name, z.size,
+                                             ', '.join(scenarios)))
+
+def _process_profiled(path, config, outdir):
+    """
+    process_well in a worker with the profiling on, returning its records.
+    """
+    profiling.reset()
+    message = process_well(path, config, outdir)
+
+    return(message, profiling.records())
+
+def run(pattern, config, outdir, workers=None):
+    """
+    Runs process_well for every LAS file matching the pattern in a process
+    pool. When the profiling is enabled, the workers profile the same
+    modules and their records are merged in this process.
+
+    Parameters
+    ----------
+    pattern : str
+        Glob pattern of the LAS files.
+    config : dict
+        Configuration from load_config.
+    outdir : str
+        Output folder.
+    workers : integer
+        Number of processes. If None, the number of CPUs.
+
+    Returns
+    -------
+    messages : list
+        Summary of each well, in the order of the files.
+    """
+    files = sorted(glob.glob(pattern))
+    if not files:
+        raise ValueError('no LAS file matches %s' % pattern)
+    os.makedirs(outdir, exist_ok=True)
+
+    settings = profiling.settings()
+    if settings is None:
+        task, init = process_well, {}
+    else:
+        task = _process_profiled
+        init = {'initializer': profiling.enable, 'initargs': settings}
+
+    with ProcessPoolExecutor(max_workers=workers, **init) as pool:
+        futures = [pool.submit(task, f, config, outdir) for f in files]
+        messages = []
+        for f, fut in zip(files, futures):
+            try:
+                result = fut.result()
+            except Exception as err:
+                messages.append('%s: failed, %s' % (f, err))
+                continue
+            if settings is not None:
+                result, rec = result
+                profiling.merge(rec)
+            messages.append(result)
+
+    return(messages)
+
+def main(argv=None):
+    """
+    Command line entry point. Returns 1 if any well failed, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description='Gassmann -> Shuey -> angle gathers for many LAS files.')
+    parser.add_argument('las', help='glob pattern of the LAS files')
+    parser.add_argument('config', nargs='?', default=None,
+                        help='JSON or YAML configuration file')
+    parser.add_argument('-o', '--outdir', default='gathers',
+                        help='output folder (default: gathers)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='number of processes (default: all CPUs)')
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    status = 0
+    for message in run(args.las, config, args.outdir, args.jobs):
+        print('[batch_gathers] ' + message)
+        if ': failed, ' in message:
+            status = 1
+
+    return(status)
+
+if __name__ == '__main__':
+    sys.exit(main())
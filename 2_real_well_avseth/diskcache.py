@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:20:00 2026
+
+@author: Felipe
+
+Opt-in disk cache of the rock-physics and reflectivity functions. The key of
+a call is a hash of the function (name and source code of its whole module,
+so an edit of a helper invalidates the entries), the array inputs (dtype,
+shape and bytes) and the other parameters. The results are .npy files opened
+as copy-on-write memory maps, so a repeated call returns at once arrays that
+can be changed in place like the computed ones, and the oldest entries are
+removed when the cache is larger than max_bytes. Calls with arguments that
+cannot be hashed (e.g. pandas objects) are not cached.
+
+    import diskcache
+    diskcache.enable() #avo_func.shueyrc, avo_func2.gassmann and vrh
+    vp_o, vs_o, rho_o = avo.gassmann(w2vp, w2vs, w2rho, w2phi, k0, ...)
+    diskcache.disable()
+
+or for a single function, shueyrc = diskcache.memoize(avo.shueyrc).
+"""
+
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+CACHE_DIR = 'avo_cache'
+MAX_BYTES = 2**30
+FUNCTIONS = ('avo_func.shueyrc', 'avo_func2.gassmann', 'avo_func2.vrh')
+
+_originals = {}
+
+def _update(h, value):
+    """
+    Adds a value (array, number, string, list, tuple, dict or None) to the
+    hash.
+    """
+    if isinstance(value, (np.ndarray, np.generic)):
+        value = np.asarray(value)
+        if not value.flags.c_contiguous:
+            value = value.copy()
+        h.update(('a%s%s' % (value.dtype.str, value.shape)).encode())
+        h.update(value.data)
+    elif isinstance(value, (list, tuple)):
+        h.update(('l%d' % len(value)).encode())
+        for v in value:
+            _update(h, v)
+    elif isinstance(value, dict):
+        h.update(('d%d' % len(value)).encode())
+        for k in sorted(value):
+            _update(h, k)
+            _update(h, value[k])
+    elif value is None or isinstance(value, (bool, int, float, complex,
+                                             str)):
+        h.update(('s%s:%r' % (type(value).__name__, value)).encode())
+    else:
+        raise TypeError('diskcache cannot hash %s' % type(value).__name__)
+
+def make_key(func, args, kwargs):
+    """
+    Key of a call: SHA-1 of the function, the source of its module and
+    the arguments.
+
+    Parameters
+    ----------
+    func : function
+        Function called.
+    args : tuple
+        Positional arguments.
+    kwargs : dict
+        Keyword arguments.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal digest.
+
+    Raises
+    ------
+    TypeError
+        If an argument cannot be hashed.
+    """
+    h = hashlib.sha1()
+    #the helpers called by func are in the same module
+    try:
+        source = inspect.getsource(inspect.getmodule(func) or func)
+    except (OSError, TypeError):
+        source = ''
+    h.update(('%s.%s\n%s' % (func.__module__, func.__qualname__,
+                             source)).encode())
+    _update(h, list(args))
+    _update(h, kwargs)
+
+    return(h.hexdigest())
+
+def _size(path):
+    """
+    Size of the files of an entry in bytes.
+    """
+    return(sum(os.path.getsize(os.path.join(path, f))
+               for f in os.listdir(path)))
+
+def load(key, cache_dir=CACHE_DIR):
+    """
+    Loads the result of a call, None if it is not in the cache. The
+    arrays are copy-on-write memory maps: they can be changed in place
+    and the cache files are not.
+    """
+    path = os.path.join(cache_dir, key)
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        items = [np.asarray(np.load(os.path.join(path, '%d.npy' % i),
+                                    mmap_mode='c'))
+                 for i in range(len(meta['kinds']))]
+    except (OSError, ValueError):
+        return(None)
+    #the last access time orders the eviction
+    now = time.time()
+    os.utime(os.path.join(path, 'meta.json'), (now, now))
+
+    items = [x[()] if kind == 'scalar' else x
+             for x, kind in zip(items, meta['kinds'])]
+
+    return(tuple(items) if meta['tuple'] else items[0])
+
+def save(key, result, cache_dir=CACHE_DIR):
+    """
+    Saves the result of a call (array, number or tuple of them). The entry
+    is written in a temporary folder and renamed, so readers never see it
+    half written.
+    """
+    items = result if isinstance(result, tuple) else (result,)
+    tmp = os.path.join(cache_dir, 'tmp-' + uuid.uuid4().hex)
+    os.makedirs(tmp)
+    kinds = []
+    for i, x in enumerate(items):
+        kinds.append('array' if isinstance(x, np.ndarray) else 'scalar')
+        np.save(os.path.join(tmp, '%d.npy' % i), np.asarray(x))
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump({'tuple': isinstance(result, tuple), 'kinds': kinds}, f)
+
+    try:
+        os.rename(tmp, os.path.join(cache_dir, key))
+    except OSError:
+        #already saved by another process
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """
+    Removes the least recently used entries until the cache is not larger
+    than max_bytes.
+
+    Returns
+    -------
+    removed : integer
+        Number of entries removed.
+    """
+    entries = []
+    for key in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, key)
+        try:
+            atime = os.path.getmtime(os.path.join(path, 'meta.json'))
+            entries.append((atime, _size(path), path))
+        except OSError:
+            continue
+    total = sum(e[1] for e in entries)
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+
+    return(removed)
+
+def clear(cache_dir=CACHE_DIR):
+    """
+    Removes the whole cache.
+    """
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+def memoize(func, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """
+    Disk cached version of a function.
+
+    Parameters
+    ----------
+    func : function
+        Function with array and scalar inputs that returns an array, a
+        number or a tuple of them.
+    cache_dir : str
+        Folder of the cache.
+    max_bytes : integer
+        Largest size of the cache.
+
+    Returns
+    -------
+    cached : function
+        Same signature of func.
+    """
+    @functools.wraps(func)
+    def cached(*args, **kwargs):
+        try:
+            key = make_key(func, args, kwargs)
+        except TypeError:
+            return(func(*args, **kwargs))
+        result = load(key, cache_dir)
+        if result is None:
+            result = func(*args, **kwargs)
+            os.makedirs(cache_dir, exist_ok=True)
+            save(key, result, cache_dir)
+            evict(cache_dir, max_bytes)
+        return(result)
+    cached.uncached = func
+
+    return(cached)
+
+def enable(functions=FUNCTIONS, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """
+    Replaces the functions in their modules by the cached versions, so the
+    notebooks and scripts that call e.g. avo.shueyrc use the cache.
+
+    Parameters
+    ----------
+    functions : list
+        Functions as 'module.function'.
+    cache_dir : str
+        Folder of the cache.
+    max_bytes : integer
+        Largest size of the cache.
+    """
+    disable()
+    for name in functions:
+        mod_name, func_name = name.rsplit('.', 1)
+        mod = importlib.import_module(mod_name)
+        func = getattr(mod, func_name)
+        _originals[(mod, func_name)] = func
+        setattr(mod, func_name, memoize(func, cache_dir, max_bytes))
+
+def disable():
+    """
+    Restores the original functions.
+    """
+    for (mod, name), func in _originals.items():
+        setattr(mod, name, func)
+    _originals.clear()
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:50:00 2026
+
+@author: Felipe
+
+Dry-rock models for unconsolidated and cemented sands: Hertz-Mindlin, soft
+(friable) sand, stiff sand, contact cement and constant cement. All of them
+are NumPy broadcasts, so porosity, pressure and coordination number can be
+given as grids, and the outputs go straight into avo_func2.gassmann_dry.
+Avseth et al., Quantitative seismic interpretation, 2006, Pages 54-58.
+Mavko et al., The rock physics handbook, 2009, Pages 246-260.
+"""
+
+import numpy as np
+
+def poisson(k, mu):
+    """
+    Poisson ratio from the bulk and shear moduli.
+    """
+    return((3*k - 2*mu) / (2*(3*k + mu)))
+
+def hertzmindlin(k0, mu0, P, phic=0.4, n=8.6, f=1.):
+    """
+    Computes the dry-rock moduli of a random pack of spheres at critical
+    porosity with the Hertz-Mindlin contact theory.
+
+    Parameters
+    ----------
+    k0 : float or array
+        Mineral bulk modulus - GPa
+    mu0 : float or array
+        Mineral shear modulus - GPa
+    P : float or array
+        Effective pressure - MPa
+    phic : float or array
+        Critical porosity.
+    n : float or array
+        Coordination number (average number of contacts per grain).
+    f : float or array
+        Fraction of grain contacts with no slip. f=1 is the original
+        Hertz-Mindlin model and f=0 the frictionless one.
+
+    Returns
+    -------
+    k_hm : float or array
+        Dry-rock bulk modulus - GPa
+    mu_hm : float or array
+        Dry-rock shear modulus - GPa
+    """
+    P = np.asarray(P)/1000. #GPa
+    nu = poisson(k0, mu0)
+    a = (n**2*(1-phic)**2*mu0**2*P) / (np.pi**2*(1-nu)**2)
+
+    k_hm = (a/18.)**(1/3.)
+    mu_hm = (2 + 3*f - nu*(1 + 3*f)) / (5*(2-nu)) * (3*a/2.)**(1/3.)
+
+    return(k_hm, mu_hm)
+
+def softsand(phi, k0, mu0, P, phic=0.4, n=8.6, f=1.):
+    """
+    Computes the dry-rock moduli with the soft sand (friable sand,
+    unconsolidated sand) model of Dvorkin and Nur (1996): modified lower
+    Hashin-Shtrikman bound between the Hertz-Mindlin pack at critical
+    porosity and the mineral.
+
+    Parameters
+    ----------
+    phi : float or array
+        Porosity in fraction.
+    k0 : float or array
+        Mineral bulk modulus - GPa
+    mu0 : float or array
+        Mineral shear modulus - GPa
+    P : float or array
+        Effective pressure - MPa
+    phic : float or array
+        Critical porosity.
+    n : float or array
+        Coordination number.
+    f : float or array
+        Fraction of grain contacts with no slip.
+
+    Returns
+    -------
+    kdry : float or array
+        Dry-rock bulk modulus - GPa
+    mudry : float or array
+        Dry-rock shear modulus - GPa
+    """
+    k_hm, mu_hm = hertzmindlin(k0, mu0, P, phic, n, f)
+    a = phi/phic
+
+    kdry = 1. / (a/(k_hm + 4/3.*mu_hm) + (1-a)/(k0 + 4/3.*mu_hm)) \
+           - 4/3.*mu_hm
+    z = mu_hm/6.*(9*k_hm + 8*mu_hm)/(k_hm + 2*mu_hm)
+    mudry = 1. / (a/(mu_hm + z) + (1-a)/(mu0 + z)) - z
+
+    return(kdry, mudry)
+
+def stiffsand(phi, k0, mu0, P, phic=0.4, n=8.6, f=1.):
+    """
+    Computes the dry-rock moduli with the stiff sand model: modified upper
+    Hashin-Shtrikman bound between the Hertz-Mindlin pack at critical
+    porosity and the mineral.
+
+    Parameters
+    ----------
+    phi : float or array
+        Porosity in fraction.
+    k0 : float or array
+        Mineral bulk modulus - GPa
+    mu0 : float or array
+        Mineral shear modulus - GPa
+    P : float or array
+        Effective pressure - MPa
+    phic : float or array
+        Critical porosity.
+    n : float or array
+        Coordination number.
+    f : float or array
+        Fraction of grain contacts with no slip.
+
+    Returns
+    -------
+    kdry : float or array
+        Dry-rock bulk modulus - GPa
+    mudry : float or array
+        Dry-rock shear modulus - GPa
+    """
+    k_hm, mu_hm = hertzmindlin(k0, mu0, P, phic, n, f)
+    a = phi/phic
+
+    kdry = 1. / (a/(k_hm + 4/3.*mu0) + (1-a)/(k0 + 4/3.*mu0)) - 4/3.*mu0
+    z = mu0/6.*(9*k0 + 8*mu0)/(k0 + 2*mu0)
+    mudry = 1. / (a/(mu_hm + z) + (1-a)/(mu0 + z)) - z
+
+    return(kdry, mudry)
+
+def contactcement(phi, k0, mu0, kc=36.8, muc=44., phic=0.4, n=8.6,
+                  scheme=2):
+    """
+    Computes the dry-rock moduli with the contact cement model of Dvorkin
+    and Nur (1996): cement added to the grains of the pack at critical
+    porosity.
+
+    Parameters
+    ----------
+    phi : float or array
+        Porosity in fraction (phi <= phic).
+    k0 : float or array
+        Mineral bulk modulus - GPa
+    mu0 : float or array
+        Mineral shear modulus - GPa
+    kc : float or array
+        Cement bulk modulus - GPa. The default is quartz.
+    muc : float or array
+        Cement shear modulus - GPa
+    phic : float or array
+        Critical porosity.
+    n : float or array
+        Coordination number.
+    scheme : integer
+        1 for all the cement at the grain contacts, 2 for the cement evenly
+        deposited on the grain surface.
+
+    Returns
+    -------
+    kdry : float or array
+        Dry-rock bulk modulus - GPa
+    mudry : float or array
+        Dry-rock shear modulus - GPa
+    """
+    nu = poisson(k0, mu0)
+    nuc = poisson(kc, muc)
+    if scheme == 1:
+        alpha = 2*((phic-phi)/(3*n*(1-phic)))**0.25
+    else:
+        alpha = (2*(phic-phi)/(3*(1-phic)))**0.5
+
+    ln = 2*muc*(1-nu)*(1-nuc) / (np.pi*mu0*(1-2*nuc))
+    lt = muc / (np.pi*mu0)
+
+    an = -0.024153*ln**-1.3646
+    bn = 0.20405*ln**-0.89008
+    cn = 0.00024649*ln**-1.9864
+    sn = an*alpha**2 + bn*alpha + cn
+
+    at = -1e-2*(2.26*nu**2 + 2.07*nu + 2.3) * \
+         lt**(0.079*nu**2 + 0.1754*nu - 1.342)
+    bt = (0.0573*nu**2 + 0.0937*nu + 0.202) * \
+         lt**(0.0274*nu**2 + 0.0529*nu - 0.8765)
+    ct = 1e-4*(9.654*nu**2 + 4.945*nu + 3.1) * \
+         lt**(0.01867*nu**2 + 0.4011*nu - 1.8186)
+    st = at*alpha**2 + bt*alpha + ct
+
+    kdry = n*(1-phic)*(kc + 4/3.*muc)*sn/6.
+    mudry = 3/5.*kdry + 3*n*(1-phic)*muc*st/20.
+
+    return(kdry, mudry)
+
+def constantcement(phi, k0, mu0, phib, kc=36.8, muc=44., phic=0.4, n=8.6,
+                   scheme=2):
+    """
+    Computes the dry-rock moduli with the constant cement model of Avseth
+    et al. (2000): sands with the same amount of contact cement and porosity
+    reduced by sorting. Soft sand type of mixing between the contact cement
+    rock at porosity phib and the mineral.
+
+    Parameters
+    ----------
+    phi : float or array
+        Porosity in fraction (phi <= phib).
+    k0 : float or array
+        Mineral bulk modulus - GPa
+    mu0 : float or array
+        Mineral shear modulus - GPa
+    phib : float or array
+        Porosity of the well-sorted cemented sand, sets the cement amount
+        (phic - phib).
+    kc : float or array
+        Cement bulk modulus - GPa
+    muc : float or array
+        Cement shear modulus - GPa
+    phic : float or array
+        Critical porosity.
+    n : float or array
+        Coordination number.
+    scheme : integer
+        Cement scheme of contactcement.
+
+    Returns
+    -------
+    kdry : float or array
+        Dry-rock bulk modulus - GPa
+    mudry : float or array
+        Dry-rock shear modulus - GPa
+    """
+    kb, mub = contactcement(phib, k0, mu0, kc, muc, phic, n, scheme)
+    a = phi/phib
+
+    kdry = 1. / (a/(kb + 4/3.*mub) + (1-a)/(k0 + 4/3.*mub)) - 4/3.*mub
+    z = mub/6.*(9*kb + 8*mub)/(kb + 2*mub)
+    mudry = 1. / (a/(mub + z) + (1-a)/(mu0 + z)) - z
+
+    return(kdry, mudry)
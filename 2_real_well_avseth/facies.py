@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:40:00 2026
+
+@author: Felipe
+
+Probabilistic facies classification with class-conditional multivariate
+Gaussians fitted on well attributes (intercept, gradient, elastic impedance,
+lambda-rho and mu-rho) and applied to attribute cubes in chunks.
+Avseth et al., Quantitative seismic interpretation, 2006, Chapter 5.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import avo_func as avo
+import impedance as ip
+
+def well_attributes(vp, vs, rho, theta1=30):
+    """
+    Computes the attributes used by the classifier from the logs.
+
+    Parameters
+    ----------
+    vp : array
+        P-velocity.
+    vs : array
+        S-velocity.
+    rho : array
+        Density.
+    theta1 : float
+        Incidence angle of the elastic impedance.
+
+    Returns
+    -------
+    attributes : dict
+        Intercept 'I', gradient 'G', elastic impedance 'EI', 'lambda_rho'
+        and 'mu_rho'.
+    """
+    _, R0, G = avo.shueyrc(vp, vs, rho, np.array([theta1]))
+    lambda_rho, mu_rho = ip.lrm(vp, vs, rho)
+
+    attributes = {'I': R0, 'G': G, 'EI': ip.ei(vp, vs, rho, theta1),
+                  'lambda_rho': lambda_rho, 'mu_rho': mu_rho}
+
+    return(attributes)
+
+def fit(features, facies, classes=None):
+    """
+    Fits a multivariate Gaussian to the attributes of each facies. Samples
+    with NaN are ignored.
+
+    Parameters
+    ----------
+    features : list of arrays
+        Attributes of the wells, e.g. [I, G] or [lambda_rho, mu_rho].
+    facies : array
+        Facies code of each sample.
+    classes : array
+        Facies codes to fit. If None, all the codes in facies.
+
+    Returns
+    -------
+    model : dict
+        'classes', 'mean' (classes x attributes), 'cov' (classes x attributes
+        x attributes) and 'prior' (classes) of the fit.
+    """
+    X = np.stack([np.ravel(f) for f in features], axis=-1).astype(float)
+    facies = np.ravel(facies)
+    valid = np.all(np.isfinite(X), axis=1)
+    X = X[valid]
+    facies = facies[valid]
+    if classes is None:
+        classes = np.unique(facies)
+    classes = np.asarray(classes)
+
+    mean = np.array([X[facies == c].mean(axis=0) for c in classes])
+    cov = np.array([np.atleast_2d(np.cov(X[facies == c], rowvar=False))
+                    for c in classes])
+    prior = np.array([np.sum(facies == c) for c in classes], dtype=float)
+    prior /= prior.sum()
+
+    model = {'classes': classes, 'mean': mean, 'cov': cov, 'prior': prior}
+
+    return(model)
+
+def save_model(path, model, key=''):
+    """
+    Saves the fitted model in a .npz file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    model : dict
+        Model from fit.
+    key : str
+        Hash of the training data, used by fit_cached.
+    """
+    np.savez(path, key=key, **model)
+
+def load_model(path):
+    """
+    Loads a model saved with save_model.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+
+    Returns
+    -------
+    model : dict
+        Model as returned by fit.
+    key : str
+        Hash of the training data.
+    """
+    with np.load(path) as f:
+        model = {k: f[k] for k in ('classes', 'mean', 'cov', 'prior')}
+        key = str(f['key'])
+
+    return(model, key)
+
+def fit_cached(path, features, facies, classes=None):
+    """
+    Same as fit, but the model is loaded from path when it was fitted with
+    the same training data, and saved there otherwise.
+
+    Parameters
+    ----------
+    path : str
+        Path of the cache file (.npz).
+    features : list of arrays
+        Attributes of the wells.
+    facies : array
+        Facies code of each sample.
+    classes : array
+        Facies codes to fit.
+
+    Returns
+    -------
+    model : dict
+        Model as returned by fit.
+    """
+    h = hashlib.sha1()
+    for a in list(features) + [facies] + \
+             ([] if classes is None else [classes]):
+        a = np.ascontiguousarray(a)
+        h.update(str((a.dtype, a.shape)).encode())
+        h.update(a.tobytes())
+    key = h.hexdigest()
+
+    if os.path.exists(path):
+        model, saved = load_model(path)
+        if saved == key:
+            return(model)
+
+    model = fit(features, facies, classes)
+    save_model(path, model, key)
+
+    return(model)
+
+def predict_proba(features, model, chunk=1000000, dtype='float32',
+                  workers=1):
+    """
+    Computes the probability of each facies for every sample of the
+    attributes (logs or cubes of any shape), in chunks of samples.
+
+    Parameters
+    ----------
+    features : list of arrays
+        Attributes in the same order used in fit, all with the same shape.
+    model : dict
+        Model from fit.
+    chunk : integer
+        Number of samples computed at once.
+    dtype : str
+        Data type of the computation and of the output. The attributes are
+        standardized in float64 before, so float32 is enough even with
+        attributes of very different scales (e.g. AI and Vp/Vs).
+    workers : integer
+        Number of threads computing the chunks. NumPy releases the GIL, so
+        the chunks run in parallel.
+
+    Returns
+    -------
+    prob : array
+        Probabilities with shape (classes,) + features[0].shape, one cube
+        per facies. Samples with NaN attributes get NaN.
+    """
+    shape = np.shape(features[0])
+    flat = [np.reshape(f, -1) for f in features]
+    n = flat[0].size
+    nc = len(model['classes'])
+
+    #standardized attributes, the constant log(scale) of the Gaussians
+    #cancels in the normalization
+    center = model['mean'].mean(axis=0)[:, None]
+    scale = np.sqrt(np.diagonal(model['cov'], axis1=1, axis2=2).mean(axis=0))
+    scale = np.where(scale > 0, scale, 1.)[:, None]
+    cov = model['cov']/(scale*scale.T)
+
+    #whitening with the inverse of the Cholesky factor of each covariance
+    L = np.linalg.cholesky(cov)
+    Linv = np.linalg.inv(L).astype(dtype)
+    mean = ((model['mean'][:, :, None] - center)/scale).astype(dtype)
+    logdet = np.log(np.diagonal(L, axis1=1, axis2=2)).sum(axis=1)
+    const = (np.log(model['prior']) - logdet).astype(dtype)
+
+    prob = np.empty((nc, n), dtype=dtype)
+
+    def block(i):
+        #attributes x samples, so every operation below runs on long rows
+        X = np.stack([f[i:i+chunk] for f in flat]).astype(float)
+        X = ((X - center)/scale).astype(dtype)
+        logp = prob[:, i:i+chunk]
+        for c in range(nc):
+            z = Linv[c] @ (X - mean[c])
+            z *= z
+            logp[c] = const[c] - 0.5*z.sum(axis=0)
+        logp -= logp.max(axis=0)
+        np.exp(logp, out=logp)
+        logp /= logp.sum(axis=0)
+
+    starts = range(0, n, chunk)
+    if workers == 1:
+        for i in starts:
+            block(i)
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            list(pool.map(block, starts))
+
+    return(prob.reshape((nc,) + shape))
+
+def classify(features, model, chunk=1000000, unclassified=-1,
+             dtype='float32', workers=1):
+    """
+    Most probable facies of every sample.
+
+    Parameters
+    ----------
+    features : list of arrays
+        Attributes in the same order used in fit, all with the same shape.
+    model : dict
+        Model from fit.
+    chunk : integer
+        Number of samples computed at once.
+    unclassified : integer
+        Code of the samples with non-finite attributes.
+    dtype : str
+        Data type of the computation, see predict_proba.
+    workers : integer
+        Number of threads, see predict_proba.
+
+    Returns
+    -------
+    facies : array
+        Facies code of every sample.
+    prob : array
+        Probability of the most probable facies (NaN where the attributes
+        are not finite).
+    """
+    p = predict_proba(features, model, chunk, dtype, workers)
+    valid = np.all(np.isfinite(p), axis=0)
+    best = np.argmax(np.nan_to_num(p, nan=-1.), axis=0)
+    facies = np.where(valid, model['classes'][best], unclassified)
+    prob = np.where(valid, np.take_along_axis(p, best[None], axis=0)[0],
+                    np.nan)
+
+    return(facies, prob)
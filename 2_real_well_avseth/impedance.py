@@ -134,4 +134,122 @@ def lrm(vp,vs,rho):
     lambda_rho = ip**2 - 2*ips**2
     mu_rho = ips**2
     
-    return(lambda_rho,mu_rho)
\ No newline at end of file
+    return(lambda_rho,mu_rho)
+
+def eei(vp,vs,rho,chi,vp0=None,vs0=None,rho0=None,k=None):
+    """
+    Computes the extended elastic impedance for one or several chi angles.
+    With an array of chi the whole log is computed at once as a
+    (samples x chi) matrix, in the log domain:
+    ln(EEI) = ln(vp0*rho0) + p*ln(vp/vp0) + q*ln(vs/vs0) + r*ln(rho/rho0).
+    Whitcombe, D, Connolly, P., Reagan, R., Redshaw, T., 2002, Extended
+    elastic impedance for fluid and lithology prediction, Geophysics, 67 (1),
+    63–67.
+
+    Parameters
+    ----------
+    vp : array
+        P-velocity.
+    vs : array
+        S-velocity.
+    rho : array
+        Density.
+    chi : float or array
+        Chi angle - degrees, from -90 to 90.
+    vp0 : float
+        Reference P-velocity. If None, the mean of vp.
+    vs0 : float
+        Reference S-velocity. If None, the mean of vs.
+    rho0 : float
+        Reference density. If None, the mean of rho.
+    k : float
+        Constant (vs/vp)**2. If None, the mean of the log.
+
+    Returns
+    -------
+    eei : array
+        Extended elastic impedance, (samples x chi) for an array of chi.
+
+    """
+    vp0 = np.nanmean(vp) if vp0 is None else vp0
+    vs0 = np.nanmean(vs) if vs0 is None else vs0
+    rho0 = np.nanmean(rho) if rho0 is None else rho0
+    k = np.nanmean((vs/vp)**2) if k is None else k
+
+    chi = np.radians(chi)
+    p = np.cos(chi) + np.sin(chi)
+    q = -8*k*np.sin(chi)
+    r = np.cos(chi) - 4*k*np.sin(chi)
+
+    logs = np.stack([np.log(vp/vp0), np.log(vs/vs0), np.log(rho/rho0)],
+                    axis=-1)
+    eei = vp0*rho0*np.exp(logs @ np.array([p, q, r]))
+
+    return(eei)
+
+def eei_correlation(vp,vs,rho,targets,chi=np.arange(-90,91),vp0=None,
+                    vs0=None,rho0=None,k=None):
+    """
+    Correlation between the EEI of all the chi angles and target logs (e.g.
+    Sw, Vsh) in one pass, to find the chi that best projects each target.
+    Each target uses the samples where it and the logs are finite.
+
+    Parameters
+    ----------
+    vp : array
+        P-velocity.
+    vs : array
+        S-velocity.
+    rho : array
+        Density.
+    targets : dict
+        Target logs, e.g. {'sw': sw, 'vsh': vsh}.
+    chi : array
+        Chi angles - degrees
+    vp0 : float
+        Reference P-velocity of eei.
+    vs0 : float
+        Reference S-velocity of eei.
+    rho0 : float
+        Reference density of eei.
+    k : float
+        Constant (vs/vp)**2 of eei.
+
+    Returns
+    -------
+    corr : dict
+        Correlation of each target for every chi.
+    best : dict
+        Chi with the largest absolute correlation for each target, NaN if
+        the target is constant or has no valid sample.
+
+    """
+    chi = np.asarray(chi, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        E = eei(vp,vs,rho,chi,vp0,vs0,rho0,k) #(samples x chi)
+    names = list(targets)
+    T = np.stack([np.asarray(targets[n], dtype=float) for n in names])
+
+    #masks (targets x samples) and masked sums as matrix products
+    M = (np.isfinite(T) & np.all(np.isfinite(E), axis=1)).astype(float)
+    E = np.where(np.isfinite(E), E, 0.)
+    T = np.where(M > 0, T, 0.)
+    n = M.sum(axis=1)[:, None]
+    se, see = M @ E, M @ E**2
+    st, stt = T.sum(axis=1)[:, None], (T**2).sum(axis=1)[:, None]
+    ste = T @ E
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = ste - st*se/n
+        var_e = see - se**2/n
+        var_t = stt - st**2/n
+        #constant logs have no correlation
+        flat = (var_e <= 1e-12*see) | (var_t <= 1e-12*stt)
+        r = np.where(flat, np.nan, cov/np.sqrt(var_e*var_t))
+
+    corr = {name: r[i] for i, name in enumerate(names)}
+    best = {name: chi[np.nanargmax(np.abs(r[i]))]
+            if np.isfinite(r[i]).any() else np.nan
+            for i, name in enumerate(names)}
+
+    return(corr, best)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:40:00 2026
+
+@author: Felipe
+
+Angle gather that keeps the reflectivity and the synthetic traces of a log
+and, when a depth window of Vp, Vs or density changes (e.g. a Gassmann
+substitution in the reservoir), recomputes only the interfaces of the window
+and the traces within a wavelet length of it.
+"""
+
+import numpy as np
+
+import avo_func as avo
+
+def _convolve_full(reflect, wavelet):
+    """
+    Full convolution of the wavelet with every column of reflect, with FFT.
+    """
+    n = reflect.shape[0] + wavelet.size - 1
+    spec = np.fft.rfft(reflect, n, axis=0)*np.fft.rfft(wavelet, n)[:, None]
+
+    return(np.fft.irfft(spec, n, axis=0))
+
+class IncrementalGather(object):
+    """
+    Shuey (1985) 2-terms angle gather of a log, same as avo.shueyrc followed
+    by avo.anglegather, with cheap updates of depth windows.
+
+    Parameters
+    ----------
+    vp : array
+        P-wave.
+    vs : array
+        S-wave.
+    rho : array
+        Density.
+    theta1 : array
+        Angles of incidence.
+    wavelet : array
+        Amplitude of the wavelet.
+
+    Attributes
+    ----------
+    reflect : 2D array
+        Reflection coefficients (samples x angles).
+    R0 : array
+        Intercept.
+    G : array
+        Gradient.
+    gather : 2D array
+        Angle gather (samples x angles).
+
+    Example
+    -------
+    >>> base = IncrementalGather(w2vp, w2vs, w2rho, angle, wavelet)
+    >>> oil = base.copy()
+    >>> oil.update(index_top_r, vp=vp_out_o[index_top_r:index_base_r],
+    ...            vs=vs_out_o[index_top_r:index_base_r],
+    ...            rho=rho_out_o[index_top_r:index_base_r])
+    """
+
+    def __init__(self, vp, vs, rho, theta1, wavelet):
+        self.vp = np.array(vp, dtype=float)
+        self.vs = np.array(vs, dtype=float)
+        self.rho = np.array(rho, dtype=float)
+        self.theta1 = np.asarray(theta1)
+        self.wavelet = np.asarray(wavelet, dtype=float)
+
+        self.reflect, self.R0, self.G = avo.shueyrc(self.vp, self.vs,
+                                                    self.rho, self.theta1)
+        self.gather = avo.anglegather(self.reflect, self.wavelet)
+
+    def copy(self):
+        """
+        Copy of the gather, to update it with another scenario and keep the
+        original one.
+        """
+        new = object.__new__(IncrementalGather)
+        for key, value in self.__dict__.items():
+            new.__dict__[key] = np.copy(value)
+
+        return(new)
+
+    def update(self, start, vp=None, vs=None, rho=None):
+        """
+        Replaces the samples start:start+len of the logs and recomputes the
+        affected part of the reflectivity and of the gather.
+
+        Parameters
+        ----------
+        start : integer
+            First sample of the window.
+        vp : array
+            New P-wave in the window. None keeps the current one.
+        vs : array
+            New S-wave in the window. None keeps the current one.
+        rho : array
+            New density in the window. None keeps the current one.
+
+        Returns
+        -------
+        window : slice
+            Samples of the gather that were recomputed.
+        """
+        stop = start
+        for log, new in ((self.vp, vp), (self.vs, vs), (self.rho, rho)):
+            if new is not None:
+                new = np.asarray(new)
+                log[start:start+new.size] = new
+                stop = max(stop, start+new.size)
+
+        ns = self.vp.size
+        nw = self.wavelet.size
+        if stop <= start:
+            return(slice(start, start))
+        if nw > ns:
+            #the wavelet is longer than the log, nothing to save
+            self.reflect, self.R0, self.G = avo.shueyrc(self.vp, self.vs,
+                                                        self.rho, self.theta1)
+            self.gather = avo.anglegather(self.reflect, self.wavelet)
+            return(slice(0, ns))
+
+        #interface i is between the samples i-1 and i, interface 0 is a copy
+        #of interface 1
+        lo = max(start, 1)
+        hi = min(stop+1, ns)
+        reflect, r0, g = avo.shueyrc(self.vp[lo-1:hi], self.vs[lo-1:hi],
+                                     self.rho[lo-1:hi], self.theta1)
+        self.reflect[lo:hi] = reflect[1:]
+        self.R0[lo:hi] = r0[1:]
+        self.G[lo:hi] = g[1:]
+        if lo == 1:
+            self.reflect[0] = self.reflect[1]
+            self.R0[0] = self.R0[1]
+            self.G[0] = self.G[1]
+            lo = 0
+
+        #samples of the gather reached by the new interfaces (halo of one
+        #wavelet length) and the interfaces needed to recompute them
+        shift = (nw-1)//2
+        j0 = max(lo-shift, 0)
+        j1 = min(hi+nw-1-shift, ns)
+        m0 = max(j0+shift-nw+1, 0)
+        m1 = min(j1+shift, ns)
+        full = _convolve_full(self.reflect[m0:m1], self.wavelet)
+        self.gather[j0:j1] = full[j0+shift-m0:j1+shift-m0]
+
+        return(slice(j0, j1))
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:50:00 2026
+
+@author: Felipe
+
+Fast reading of tabular logs like qsiwell2.csv: only the needed columns,
+with explicit float32 dtype, converted once to one .npy file per column and
+then opened as memory maps. The columns are zero-copy arrays that go
+straight into impedance and avo_func2, e.g.
+
+    logs = logio.load_logs('qsiwell2.csv', ['VP', 'VS', 'RHO'])
+    ai = ip.ai(logs['VP'], logs['RHO'])
+"""
+
+import json
+import os
+
+import numpy as np
+
+def read_logs(path, columns=None, dtype='float32'):
+    """
+    Reads the columns of a CSV log file in memory.
+
+    Parameters
+    ----------
+    path : str
+        Path of the CSV file with a header line.
+    columns : list
+        Columns to read. If None, all of them.
+    dtype : str
+        Data type of the columns.
+
+    Returns
+    -------
+    logs : dict
+        Array of each column.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=columns, dtype=dtype, engine='c')
+    logs = {c: df[c].to_numpy() for c in df.columns}
+
+    return(logs)
+
+def _count_rows(path, block=1 << 24):
+    """
+    Number of data lines of a text file with a header line.
+    """
+    n = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while True:
+            buf = f.read(block)
+            if not buf:
+                break
+            n += buf.count(b'\n')
+            last = buf[-1:]
+    if last != b'\n':
+        n += 1
+
+    return(n - 1)
+
+def to_npy(path, outdir, columns=None, dtype='float32', chunksize=1000000):
+    """
+    Converts a CSV log file to one .npy file per column, in chunks of rows,
+    so files larger than the memory can be converted.
+
+    Parameters
+    ----------
+    path : str
+        Path of the CSV file with a header line.
+    outdir : str
+        Output folder. A manifest.json describes the conversion.
+    columns : list
+        Columns to convert. If None, all of them.
+    dtype : str
+        Data type of the columns.
+    chunksize : integer
+        Number of rows read at once.
+
+    Returns
+    -------
+    manifest : dict
+        Source file, its size and modification time, columns, number of
+        rows and data type.
+
+    Raises
+    ------
+    ValueError
+        If the file does not have a header line.
+    """
+    import pandas as pd
+
+    os.makedirs(outdir, exist_ok=True)
+    nrows = _count_rows(path)
+    try:
+        header = pd.read_csv(path, usecols=columns, nrows=0, engine='c')
+    except pd.errors.EmptyDataError:
+        raise ValueError('%s is empty, a header line is needed' % path)
+    columns = list(header.columns)
+
+    start = 0
+    if nrows <= 0:
+        #header only, empty files cannot be memory mapped
+        for c in columns:
+            np.save(os.path.join(outdir, c+'.npy'), np.zeros(0, dtype=dtype))
+    else:
+        out = {c: np.lib.format.open_memmap(
+                   os.path.join(outdir, c+'.npy'), mode='w+',
+                   dtype=dtype, shape=(nrows,)) for c in columns}
+        for chunk in pd.read_csv(path, usecols=columns, dtype=dtype,
+                                 engine='c', chunksize=chunksize):
+            stop = start + len(chunk)
+            for c in columns:
+                out[c][start:stop] = chunk[c].to_numpy()
+            start = stop
+        for c in columns:
+            out[c].flush()
+
+    stat = os.stat(path)
+    #blank lines are counted by _count_rows but skipped by pandas
+    manifest = {'source': os.path.abspath(path), 'size': stat.st_size,
+                'mtime': stat.st_mtime, 'columns': columns, 'nrows': start,
+                'dtype': np.dtype(dtype).name}
+    with open(os.path.join(outdir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+    return(manifest)
+
+def open_logs(outdir, columns=None, mmap_mode='r'):
+    """
+    Opens the columns converted by to_npy as memory maps. Nothing is read
+    until the samples are used.
+
+    Parameters
+    ----------
+    outdir : str
+        Folder written by to_npy.
+    columns : list
+        Columns to open. If None, all of them.
+    mmap_mode : str
+        Memory map mode of np.load ('r' read only, 'c' copy on write).
+
+    Returns
+    -------
+    logs : dict
+        Memory mapped array of each column.
+    """
+    with open(os.path.join(outdir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    columns = manifest['columns'] if columns is None else columns
+
+    n = manifest['nrows']
+    logs = {c: np.load(os.path.join(outdir, c+'.npy'), mmap_mode=mmap_mode)[:n]
+            for c in columns}
+
+    return(logs)
+
+def load_logs(path, columns=None, outdir=None, dtype='float32'):
+    """
+    Opens the columns of a CSV log file as memory maps, converting it with
+    to_npy only when the cache is missing, older than the CSV or does not
+    have all the columns. The columns already in an up to date cache are
+    converted again with the new ones, so the cache keeps all of them.
+
+    Parameters
+    ----------
+    path : str
+        Path of the CSV file with a header line.
+    columns : list
+        Columns to open. If None, all of them.
+    outdir : str
+        Cache folder. The default is <path without extension>_npy.
+    dtype : str
+        Data type of the columns.
+
+    Returns
+    -------
+    logs : dict
+        Memory mapped array of each column.
+    """
+    outdir = outdir or os.path.splitext(path)[0] + '_npy'
+    stat = os.stat(path)
+
+    fresh = False
+    cached = []
+    try:
+        with open(os.path.join(outdir, 'manifest.json')) as f:
+            manifest = json.load(f)
+        if (manifest['size'] == stat.st_size and
+                manifest['mtime'] == stat.st_mtime and
+                manifest['dtype'] == np.dtype(dtype).name):
+            cached = manifest['columns']
+        fresh = columns is not None and set(columns) <= set(cached)
+        if columns is None:
+            with open(path) as f:
+                header = f.readline().strip().split(',')
+            fresh = cached == header
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if not fresh:
+        new = None if columns is None else \
+              list(cached) + [c for c in columns if c not in cached]
+        to_npy(path, outdir, new, dtype)
+
+    return(open_logs(outdir, columns))
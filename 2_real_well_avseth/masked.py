@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:25:00 2026
+
+@author: Felipe
+
+Versions of snell, akirichards, shueyrc and gassmann that compute only the
+valid samples of gappy logs (NaN from null_subs=np.nan, zero Vs or density,
+post-critical angles, unphysical fluid substitution): the valid samples are
+compressed, the kernel of avo_func/avo_func2 runs on them and the result is
+scattered back with a fill value. Each function also returns the mask of
+the valid samples, so no warnings are raised and no NaN has to be cleaned
+afterwards.
+"""
+
+import numpy as np
+
+import avo_func as avo
+import avo_func2 as avo2
+
+def _scatter(valid, values, fill):
+    """
+    Puts the values of the valid samples back in an array with the shape of
+    the mask, fill elsewhere.
+    """
+    out = np.full(valid.shape + np.shape(values)[1:], fill,
+                  dtype=np.result_type(values, fill))
+    out[valid] = values
+
+    return(out)
+
+def snell(vp1, vp2, theta1, fill=np.nan):
+    """
+    Angles of refraction (avo.snell) for the pre-critical samples only.
+
+    Parameters
+    ----------
+    vp1 : array
+        P-wave in the upper layer.
+    vp2 : array
+        P-wave in the lower layer.
+    theta1 : array
+        Angles of incidence - radians (as avo.snell).
+    fill : float
+        Value of theta2 for post-critical and invalid samples.
+
+    Returns
+    -------
+    theta2 : array
+        Angles of refraction.
+    p : array
+        Ray parameter.
+    valid : array
+        True for the pre-critical samples with finite velocities.
+    """
+    vp1, vp2, theta1 = np.broadcast_arrays(vp1, vp2, theta1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = np.sin(theta1)/vp1
+        valid = np.isfinite(p) & np.isfinite(vp2) & (vp1 > 0) & \
+                (np.abs(p*vp2) <= 1)
+
+    theta2, _ = avo.snell(vp1[valid], vp2[valid], theta1[valid])
+    theta2 = _scatter(valid, theta2, fill)
+    p = np.where(valid, p, fill)
+
+    return(theta2, p, valid)
+
+def akirichards(vp1, vs1, rho1, vp2, vs2, rho2, theta1, fill=np.nan):
+    """
+    Aki and Richards reflectivity (avo.akirichards) for the valid,
+    pre-critical samples only.
+
+    Parameters
+    ----------
+    vp1 : array
+        P-wave in the upper layer.
+    vs1 : array
+        S-wave in the upper layer.
+    rho1 : array
+        Density in the upper layer.
+    vp2 : array
+        P-wave in the lower layer.
+    vs2 : array
+        S-wave in the lower layer.
+    rho2 : array
+        Density in the lower layer.
+    theta1 : array
+        Angles of incidence - degrees
+    fill : float
+        Value of R for the invalid samples.
+
+    Returns
+    -------
+    R : array
+        Reflection coefficient.
+    valid : array
+        True for the computed samples.
+    """
+    arrays = np.broadcast_arrays(vp1, vs1, rho1, vp2, vs2, rho2, theta1)
+    _, _, valid = snell(arrays[0], arrays[3], np.radians(arrays[6]))
+    valid &= np.all([np.isfinite(a) for a in arrays], axis=0)
+    valid &= (arrays[1] + arrays[4] > 0) & (arrays[2] + arrays[5] > 0)
+
+    R = avo.akirichards(*[a[valid] for a in arrays])
+
+    return(_scatter(valid, R, fill), valid)
+
+def shueyrc(vp0, vs0, rho0, theta1, fill=0.):
+    """
+    Shuey 2-term reflectivity of a log (avo.shueyrc) with gaps. An interface
+    is computed only when the samples above and below are valid (finite,
+    positive Vp, Vs and density), so the gaps do not create interfaces.
+    As in avo.shueyrc, row i is the interface between samples i-1 and i and
+    the first row repeats the second.
+
+    Parameters
+    ----------
+    vp0 : array
+        P-wave.
+    vs0 : array
+        S-wave.
+    rho0 : array
+        Density.
+    theta1 : array
+        Angles of incidence - degrees
+    fill : float
+        Value of R, R0 and G at the invalid interfaces. The default 0 makes
+        R ready for avo.anglegather.
+
+    Returns
+    -------
+    R : array
+        Reflection coefficient (samples x angles).
+    R0 : array
+        Intercept.
+    G : array
+        Gradient.
+    valid : array
+        True for the computed interfaces.
+    """
+    vp0, vs0, rho0 = (np.asarray(a, dtype=float) for a in (vp0, vs0, rho0))
+    with np.errstate(invalid='ignore'):
+        ok = np.isfinite(vp0) & np.isfinite(vs0) & np.isfinite(rho0) & \
+             (vp0 > 0) & (vs0 > 0) & (rho0 > 0)
+    pair = ok[1:] & ok[:-1]
+    i = np.flatnonzero(pair)
+
+    R0, G, _, _ = avo.shuey(vp0[i], vs0[i], rho0[i], vp0[i+1], vs0[i+1],
+                            rho0[i+1], 0.)
+    valid = np.insert(pair, 0, pair[0])
+    R0 = _scatter(pair, R0, fill)
+    G = _scatter(pair, G, fill)
+    R0 = np.insert(R0, 0, R0[0])
+    G = np.insert(G, 0, G[0])
+
+    s2 = np.sin(np.radians(np.atleast_1d(theta1)))**2
+    R = np.where(valid[:, None], np.outer(R0, 1) + np.outer(G, s2), fill)
+
+    return(R, R0, G, valid)
+
+def gassmann(vp1, vs1, rho1, phi, k0, k_f1, rho_f1, k_f2, rho_f2,
+             fill=np.nan):
+    """
+    Gassmann fluid substitution (avo2.gassmann) for the valid samples only.
+    Samples with missing logs or an unphysical result (negative dry-rock or
+    saturated modulus) are not substituted.
+
+    Parameters
+    ----------
+    vp1 : float or array
+        Initial P-wave velocity - m/s
+    vs1 : float or array
+        Initial S-wave velocity - m/s
+    rho1 : float or array
+        Initial density - g/cm3
+    phi : float or array
+        Porosity in fraction.
+    k0 : float or array
+        Mineral bulk modulus - GPa
+    k_f1 : float or array
+        Initial fluid bulk modulus - GPa
+    rho_f1 : float or array
+        Initial fluid density - g/cm3
+    k_f2 : float or array
+        Final fluid bulk modulus - GPa
+    rho_f2 : float or array
+        Final fluid density - g/cm3
+    fill : float or None
+        Value of the invalid samples. If None, they keep the initial
+        Vp, Vs and density.
+
+    Returns
+    -------
+    vp2 : array
+        Final P-wave velocity - m/s
+    vs2 : array
+        Final S-wave velocity - m/s
+    rho2 : array
+        Final density - g/cm3
+    valid : array
+        True for the substituted samples.
+    """
+    inputs = (vp1, vs1, rho1, phi, k0, k_f1, rho_f1, k_f2, rho_f2)
+    #1-d while masking, so scalars work too; the shape is restored below
+    shape = np.broadcast_shapes(*[np.shape(a) for a in inputs])
+    arrays = np.broadcast_arrays(*[np.atleast_1d(a) for a in inputs])
+    with np.errstate(invalid='ignore'):
+        valid = np.all([np.isfinite(a) for a in arrays], axis=0) & \
+                (arrays[0] > 0) & (arrays[1] >= 0) & (arrays[2] > 0) & \
+                (arrays[3] > 0)
+
+    sub = [a[valid] for a in arrays]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vp2, vs2, rho2 = avo2.gassmann(*sub)
+        #moduli of avo2.gassmann (GPa), to reject negative ones
+        vp1, vs1, rho1, phi, k0, k_f1 = sub[:6]
+        k_sat1 = rho1*((vp1/1000)**2 - (4/3)*(vs1/1000)**2)
+        kdry = (k_sat1*((phi*k0)/k_f1 + 1 - phi) - k0)/ \
+               ((phi*k0)/k_f1 + (k_sat1/k0) - 1 - phi)
+        k_sat2 = rho2*((vp2/1000)**2 - (4/3)*(vs2/1000)**2)
+    #unphysical results of the valid inputs
+    good = np.isfinite(vp2) & np.isfinite(vs2) & (rho2 > 0) & \
+           (kdry >= 0) & (k_sat2 >= 0)
+    valid[valid] = good
+
+    if fill is None:
+        out = [a.astype(float) for a in arrays[:3]]
+        for o, v in zip(out, (vp2, vs2, rho2)):
+            o[valid] = v[good]
+    else:
+        out = [_scatter(valid, v[good], fill) for v in (vp2, vs2, rho2)]
+    out = [o.reshape(shape) for o in out]
+
+    return(out[0], out[1], out[2], valid.reshape(shape))
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:20:00 2026
+
+@author: Felipe
+
+Non-stationary (time-variant) convolution for long synthetics: the wavelet
+changes with time, given as a wavelet bank or by a constant-Q attenuation
+model. The reflectivity is split in overlapping Hann blocks, each block is
+convolved with its own wavelet by FFT and the blocks are overlap-added, so
+the cost stays close to a single FFT convolution.
+"""
+
+import numpy as np
+
+def q_wavelets(wavelet, dt, times, q):
+    """
+    Computes a wavelet bank with constant-Q amplitude attenuation: the
+    spectrum of the wavelet at time t is multiplied by exp(-pi*f*t/Q).
+    The phase is not changed (zero-phase wavelets stay zero-phase).
+
+    Parameters
+    ----------
+    wavelet : array
+        Amplitude of the wavelet at time zero (e.g. from avo.rickerwave).
+    dt : float
+        Sample rate - s
+    times : array
+        Times of the wavelets of the bank - s
+    q : float
+        Quality factor.
+
+    Returns
+    -------
+    bank : 2D array
+        Wavelet at each time (times x wavelet samples).
+    """
+    wavelet = np.asarray(wavelet, dtype=float)
+    nw = wavelet.size
+    f = np.fft.rfftfreq(nw, dt)
+    #keep the wavelet centered while filtering
+    spec = np.fft.rfft(np.fft.ifftshift(wavelet))
+    atten = np.exp(-np.pi*f[None, :]*np.asarray(times, dtype=float)[:, None]/q)
+    bank = np.fft.fftshift(np.fft.irfft(spec*atten, nw, axis=-1), axes=-1)
+
+    return(bank)
+
+def ns_convolve(reflect, bank, centers, hop=64):
+    """
+    Convolves the reflectivity with a wavelet that changes with time, with
+    overlap-add of FFT convolved blocks. With a single wavelet in the bank
+    and finite coefficients, the result is the same as avo.anglegather
+    (np.convolve mode='same') when the wavelet is not longer than the
+    trace. For a longer wavelet anglegather returns one sample per wavelet
+    sample, and this function returns only the ones aligned with the
+    reflectivity samples.
+
+    Parameters
+    ----------
+    reflect : array
+        Reflection coefficients (samples) or (samples x angles).
+    bank : 2D array
+        Wavelets (wavelets x wavelet samples), all with the same length.
+    centers : array
+        Sample of the reflectivity where each wavelet of the bank applies,
+        increasing. The wavelet between two centers is linearly
+        interpolated.
+    hop : integer
+        Distance between the blocks in samples. The blocks have 2*hop
+        samples, so the wavelet is updated every hop samples.
+
+    Returns
+    -------
+    trace : array
+        Synthetic, same shape of reflect.
+    """
+    reflect = np.asarray(reflect, dtype=float)
+    single = reflect.ndim == 1
+    if single:
+        reflect = reflect[:, None]
+    bank = np.atleast_2d(np.asarray(bank, dtype=float))
+    centers = np.atleast_1d(np.asarray(centers, dtype=float))
+    ns, nang = reflect.shape
+    nw = bank.shape[1]
+    L = 2*hop
+
+    #periodic Hann windows with 50% overlap add up to one
+    nb = int(np.ceil(ns/hop)) + 1
+    padded = np.zeros(((nb+1)*hop, nang))
+    padded[hop:hop+ns] = reflect
+    window = 0.5 - 0.5*np.cos(2*np.pi*np.arange(L)/L)
+    blocks = np.lib.stride_tricks.sliding_window_view(padded, L, axis=0)
+    blocks = blocks[::hop][:nb]*window #(blocks x angles x L)
+
+    #wavelet of each block, linear interpolation of the bank at the center
+    #of the block (sample k*hop of the reflectivity)
+    pos = np.interp(np.arange(nb)*hop, centers, np.arange(centers.size))
+    i0 = np.floor(pos).astype(int)
+    i1 = np.minimum(i0+1, centers.size-1)
+    w = (pos - i0)[:, None]
+    wavelets = (1-w)*bank[i0] + w*bank[i1]
+
+    nfft = L + nw - 1
+    spec = np.fft.rfft(blocks, nfft, axis=-1) * \
+           np.fft.rfft(wavelets, nfft, axis=-1)[:, None, :]
+    conv = np.fft.irfft(spec, nfft, axis=-1)
+
+    full = np.zeros(((nb+1)*hop + nw - 1, nang))
+    for k in range(nb):
+        full[k*hop:k*hop+nfft] += conv[k].T
+
+    #back to the samples of the reflectivity, centered as mode='same'
+    start = hop + (nw-1)//2
+    trace = full[start:start+ns]
+
+    return(trace[:, 0] if single else trace)
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:20:00 2026
+
+@author: Felipe
+
+Stochastic pseudo-wells: layered Vp, Vs and density logs drawn from the
+statistics of each facies of a real well (qsiwell2.csv with the facies of
+facies_wells.mat), fluid substituted with Gassmann, with the Shuey angle
+gathers, intercept and gradient of every well.
+
+Each pseudo-well has its own random stream spawned from a single seed, so
+the library is the same for any number of workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.signal import lfilter
+
+import avo_func as avo
+import avo_func2 as avo2
+import logio
+
+def load_qsiwell(path='qsiwell2.csv', facies_path='facies_wells.mat'):
+    """
+    Reads the logs of qsiwell2.csv and the facies of well 2.
+
+    Parameters
+    ----------
+    path : str
+        Path of qsiwell2.csv.
+    facies_path : str
+        Path of facies_wells.mat.
+
+    Returns
+    -------
+    logs : dict
+        'depth', 'vp' (m/s), 'vs' (m/s), 'rho' (g/cc) and 'facies'.
+    """
+    from scipy.io import loadmat
+
+    data = logio.read_logs(path, ['DEPTH', 'VP', 'VS', 'RHO'], 'float64')
+    facies = loadmat(facies_path)['facies_well2'][:, 1].astype(int)
+    logs = {'depth': data['DEPTH'], 'vp': data['VP'], 'vs': data['VS'],
+            'rho': data['RHO'], 'facies': facies}
+
+    return(logs)
+
+def _runs(facies):
+    """
+    Facies and length (samples) of each layer of a facies log.
+    """
+    edges = np.flatnonzero(np.diff(facies)) + 1
+    starts = np.concatenate([[0], edges])
+    lengths = np.diff(np.concatenate([starts, [facies.size]]))
+
+    return(facies[starts], lengths)
+
+def fit_facies_stats(vp, vs, rho, facies):
+    """
+    Fits the statistics of each facies used to draw the pseudo-wells:
+    mean and covariance of (Vp, Vs, rho), lag-one autocorrelation of the
+    residuals (vertical correlation), lognormal thickness of the layers and
+    the transition probabilities between facies.
+
+    Parameters
+    ----------
+    vp : array
+        P-velocity.
+    vs : array
+        S-velocity.
+    rho : array
+        Density.
+    facies : array
+        Facies code of each sample.
+
+    Returns
+    -------
+    stats : dict
+        'classes', 'mean' (classes x 3), 'cov' (classes x 3 x 3), 'corr'
+        (classes x 3), 'thick_mu' and 'thick_sigma' (mean and standard
+        deviation of the log of the thickness in samples) and 'transition'
+        (classes x classes, uniform for a facies without transitions and
+        [[1.]] for a single facies).
+    """
+    X = np.stack([vp, vs, rho], axis=-1)
+    valid = np.all(np.isfinite(X), axis=1)
+    classes = np.unique(facies[valid])
+    nc = classes.size
+
+    mean = np.zeros((nc, 3))
+    cov = np.zeros((nc, 3, 3))
+    corr = np.zeros((nc, 3))
+    for i, c in enumerate(classes):
+        sel = valid & (facies == c)
+        mean[i] = X[sel].mean(axis=0)
+        cov[i] = np.cov(X[sel], rowvar=False)
+        #pairs of consecutive samples inside the facies
+        pair = sel[1:] & sel[:-1]
+        r = (X[1:] - mean[i])[pair] * (X[:-1] - mean[i])[pair]
+        corr[i] = np.clip(r.mean(axis=0)/np.diag(cov[i]), 0, 0.999)
+
+    code, length = _runs(np.where(valid, facies, -1))
+    keep = code >= 0
+    code, length = code[keep], length[keep]
+    pos = np.searchsorted(classes, code)
+    thick_mu = np.array([np.log(length[pos == i]).mean() for i in range(nc)])
+    thick_sigma = np.array([np.log(length[pos == i]).std()
+                            for i in range(nc)])
+
+    transition = np.zeros((nc, nc))
+    np.add.at(transition, (pos[:-1], pos[1:]), 1)
+    np.fill_diagonal(transition, 0)
+    total = transition.sum(axis=1, keepdims=True)
+    transition = np.where(total > 0, transition/np.maximum(total, 1),
+                          1./max(nc-1, 1))
+    #a single facies can only follow itself
+    np.fill_diagonal(transition, 0 if nc > 1 else 1)
+
+    stats = {'classes': classes, 'mean': mean, 'cov': cov, 'corr': corr,
+             'thick_mu': thick_mu, 'thick_sigma': thick_sigma,
+             'transition': transition}
+
+    return(stats)
+
+def pseudowell(stats, nsamples, rng, thickness_scale=1.):
+    """
+    Draws one pseudo-well.
+
+    Parameters
+    ----------
+    stats : dict
+        Statistics from fit_facies_stats.
+    nsamples : integer
+        Number of samples of the well.
+    rng : numpy.random.Generator
+        Random stream of the well.
+    thickness_scale : float
+        Multiplies the thickness of the layers.
+
+    Returns
+    -------
+    facies : array
+        Facies code of each sample.
+    vp : array
+        P-velocity.
+    vs : array
+        S-velocity.
+    rho : array
+        Density.
+    """
+    nc = stats['classes'].size
+
+    #Markov chain of layers with lognormal thickness
+    pos = []
+    total = 0
+    i = rng.integers(nc)
+    while total < nsamples:
+        n = int(np.ceil(thickness_scale*np.exp(rng.normal(
+                stats['thick_mu'][i], stats['thick_sigma'][i]))))
+        pos.append((i, n))
+        total += n
+        i = rng.choice(nc, p=stats['transition'][i])
+    layer = np.repeat([p[0] for p in pos], [p[1] for p in pos])[:nsamples]
+
+    #AR(1) vertically correlated noise with unit variance, restarted in
+    #each layer and colored by the covariance of its facies
+    w = rng.standard_normal((nsamples, 3))
+    e = np.empty_like(w)
+    top = 0
+    for i, n in pos:
+        seg = slice(top, min(top+n, nsamples))
+        for j in range(3):
+            r = stats['corr'][i, j]
+            e[seg, j], _ = lfilter([np.sqrt(1-r**2)], [1, -r], w[seg, j],
+                                   zi=[r*rng.standard_normal()])
+        top += n
+    L = np.linalg.cholesky(stats['cov'])[layer]
+    X = stats['mean'][layer] + np.einsum('nij,nj->ni', L, e)
+
+    return(stats['classes'][layer], X[:, 0], X[:, 1], X[:, 2])
+
+def _well(seed, stats, nsamples, theta1, wavelet, sands, fluid,
+          thickness_scale):
+    """
+    Draws, substitutes and models one pseudo-well (worker of library).
+    """
+    rng = np.random.default_rng(seed)
+    facies, vp, vs, rho = pseudowell(stats, nsamples, rng, thickness_scale)
+    vs = np.clip(vs, 1., None)
+
+    #density porosity of the sands, from brine to the final fluid
+    sand = np.isin(facies, sands)
+    phi = np.clip((fluid['rho_qz']-rho)/(fluid['rho_qz']-fluid['rho_b']),
+                  0.01, 0.4)
+    with np.errstate(invalid='ignore'):
+        vp2, vs2, rho2 = avo2.gassmann(vp, vs, rho, phi, fluid['k_qz'],
+                                       fluid['k_b'], fluid['rho_b'],
+                                       fluid['k_f2'], fluid['rho_f2'])
+    #draws with an unphysical dry rock keep the brine properties
+    sand &= np.isfinite(vp2)
+    vp2 = np.where(sand, vp2, vp)
+    vs2 = np.where(sand, vs2, vs)
+    rho2 = np.where(sand, rho2, rho)
+
+    out = {'facies': facies, 'vp': [], 'vs': [], 'rho': [], 'R0': [],
+           'G': [], 'gather': []}
+    for a, b, c in ((vp, vs, rho), (vp2, vs2, rho2)):
+        reflect, R0, G = avo.shueyrc(a, b, c, theta1)
+        for key, value in (('vp', a), ('vs', b), ('rho', c), ('R0', R0),
+                           ('G', G),
+                           ('gather', avo.anglegather(reflect, wavelet))):
+            out[key].append(value)
+
+    return(out)
+
+def _wells(args):
+    """
+    Runs _well for a list of seeds, so each task sent to a process holds
+    several wells.
+    """
+    seeds, params = args
+
+    return([_well(s, **params) for s in seeds])
+
+def library(stats, nwells, nsamples, theta1, wavelet, sands, seed=0,
+            workers=None, fluid=None, thickness_scale=1., batch=64):
+    """
+    Draws a library of pseudo-wells with their angle gathers in parallel.
+
+    Parameters
+    ----------
+    stats : dict
+        Statistics from fit_facies_stats.
+    nwells : integer
+        Number of pseudo-wells.
+    nsamples : integer
+        Number of samples of each well.
+    theta1 : array
+        Angles of incidence.
+    wavelet : array
+        Amplitude of the wavelet.
+    sands : list
+        Facies codes substituted with the final fluid.
+    seed : integer
+        Seed of the library. Well i always uses the i-th stream spawned from
+        this seed, whatever the number of workers.
+    workers : integer
+        Number of processes. 1 runs in the current process.
+    fluid : dict
+        Quartz ('k_qz', 'rho_qz'), in-situ brine ('k_b', 'rho_b') and final
+        fluid ('k_f2', 'rho_f2'). The default substitutes brine by the oil
+        of 1_well_2_avseth.ipynb.
+    thickness_scale : float
+        Multiplies the thickness of the layers.
+    batch : integer
+        Number of wells sent to a process at once.
+
+    Returns
+    -------
+    lib : dict
+        'facies' (wells x samples), and 'vp', 'vs', 'rho', 'R0', 'G'
+        (wells x fluid x samples) and 'gather' (wells x fluid x samples x
+        angles), with fluid 0 the brine case and 1 the substituted one.
+    """
+    params = {'stats': stats, 'nsamples': nsamples,
+              'theta1': np.asarray(theta1), 'wavelet': np.asarray(wavelet),
+              'sands': sands, 'thickness_scale': thickness_scale,
+              'fluid': {'k_qz': 36.8, 'rho_qz': 2.65, 'k_b': 2.8,
+                        'rho_b': 1.09, 'k_f2': 0.94, 'rho_f2': 0.78}}
+    params['fluid'].update(fluid or {})
+
+    seeds = np.random.SeedSequence(seed).spawn(nwells)
+    tasks = [(seeds[i:i+batch], params) for i in range(0, nwells, batch)]
+    if workers == 1:
+        wells = [w for t in tasks for w in _wells(t)]
+    else:
+        with ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+            wells = [w for ws in pool.map(_wells, tasks) for w in ws]
+
+    lib = {'facies': np.array([w['facies'] for w in wells], dtype=np.uint8)}
+    for key in ('vp', 'vs', 'rho', 'R0', 'G', 'gather'):
+        lib[key] = np.array([w[key] for w in wells], dtype=np.float32)
+
+    return(lib)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:20:00 2026
+
+@author: Felipe
+
+Rock-physics templates (RPT): AI versus Vp/Vs (or lambda-rho versus mu-rho)
+precomputed on a dense porosity x saturation x shale volume grid, and a
+KD-tree to assign log or inverted samples to their nearest grid node.
+Avseth et al., Quantitative seismic interpretation, 2006, Page 256.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+import avo_func2 as avo
+import impedance as ip
+from scenarios import fluid_mix
+
+def critical_porosity(phi, k0, mu0, phic=0.4):
+    """
+    Dry-rock moduli with the critical porosity model (Nur, 1992).
+    Mavko et al., The rock physics handbook, 2009, Page 353.
+
+    Parameters
+    ----------
+    phi : float or array
+        Porosity in fraction.
+    k0 : float or array
+        Mineral bulk modulus - GPa
+    mu0 : float or array
+        Mineral shear modulus - GPa
+    phic : float
+        Critical porosity.
+
+    Returns
+    -------
+    kdry : float or array
+        Dry-rock bulk modulus - GPa
+    mudry : float or array
+        Dry-rock shear modulus - GPa
+    """
+    f = np.clip(1 - phi/phic, 0, 1)
+
+    return(k0*f, mu0*f)
+
+def rpt_grid(phi, sw, vsh, k_qz=36.8, mu_qz=44., rho_qz=2.65, k_sh=15.,
+             mu_sh=5., rho_sh=2.81, k_b=2.8, rho_b=1.09, k_hc=0.94,
+             rho_hc=0.78, law='reuss', dry=critical_porosity):
+    """
+    Computes the template on the porosity x saturation x shale volume grid.
+    The default parameters are the ones of 1_well_2_avseth.ipynb (quartz,
+    clay, brine and oil from Avseth et al., 2001 and 2005).
+
+    Parameters
+    ----------
+    phi : array
+        Porosities in fraction.
+    sw : array
+        Water saturations in fraction.
+    vsh : array
+        Shale volumes in fraction of the mineral.
+    k_qz, mu_qz, rho_qz : float
+        Quartz bulk modulus (GPa), shear modulus (GPa) and density (g/cm3).
+    k_sh, mu_sh, rho_sh : float
+        Clay bulk modulus (GPa), shear modulus (GPa) and density (g/cm3).
+    k_b, rho_b : float
+        Brine bulk modulus (GPa) and density (g/cm3).
+    k_hc, rho_hc : float
+        Hydrocarbon bulk modulus (GPa) and density (g/cm3).
+    law : str
+        Fluid mixing law, see scenarios.fluid_mix.
+    dry : function
+        Dry-rock model, dry(phi, k0, mu0) -> (kdry, mudry).
+
+    Returns
+    -------
+    grid : dict
+        The axes 'phi', 'sw' and 'vsh' and the properties 'vp', 'vs', 'rho',
+        'ai', 'vpvs', 'lambda_rho' and 'mu_rho' with shape
+        (phi x sw x vsh).
+    """
+    phi = np.asarray(phi, dtype=float)
+    sw = np.asarray(sw, dtype=float)
+    vsh = np.asarray(vsh, dtype=float)
+
+    _, _, _, _, k0, mu0 = avo.vrh([vsh, 1-vsh], [k_sh, k_qz], [mu_sh, mu_qz])
+    rho0 = vsh*rho_sh + (1-vsh)*rho_qz
+    k_f = fluid_mix(sw, k_b, k_hc, law)
+    rho_f = sw*rho_b + (1-sw)*rho_hc
+
+    #(phi x sw x vsh)
+    P = phi[:, None, None]
+    kdry, mudry = dry(P, k0[None, None, :], mu0[None, None, :])
+    vp, vs, rho = avo.gassmann_dry(kdry, mudry, P, k0[None, None, :],
+                                   rho0[None, None, :], k_f[None, :, None],
+                                   rho_f[None, :, None])
+    shape = (phi.size, sw.size, vsh.size)
+    vp, vs, rho = [np.broadcast_to(a, shape) for a in (vp, vs, rho)]
+    lambda_rho, mu_rho = ip.lrm(vp, vs, rho)
+
+    grid = {'phi': phi, 'sw': sw, 'vsh': vsh, 'vp': vp, 'vs': vs,
+            'rho': rho, 'ai': ip.ai(vp, rho), 'vpvs': vp/vs,
+            'lambda_rho': lambda_rho, 'mu_rho': mu_rho}
+
+    return(grid)
+
+def save_rpt(path, grid):
+    """
+    Saves the template in a .npz file.
+    """
+    np.savez(path, **grid)
+
+def load_rpt(path):
+    """
+    Loads a template saved with save_rpt.
+    """
+    with np.load(path) as f:
+        grid = {k: f[k] for k in f.files}
+
+    return(grid)
+
+def rpt_index(grid, x='ai', y='vpvs'):
+    """
+    Builds the KD-tree over the template nodes in the (x, y) plane. Both
+    axes are scaled by their standard deviation so the distance is not
+    dominated by the impedance.
+
+    Parameters
+    ----------
+    grid : dict
+        Template from rpt_grid or load_rpt.
+    x : str
+        Property of the horizontal axis, e.g. 'ai' or 'lambda_rho'.
+    y : str
+        Property of the vertical axis, e.g. 'vpvs' or 'mu_rho'.
+
+    Returns
+    -------
+    index : dict
+        The tree, the axes names, the scale and the grid position
+        (phi, sw, vsh indices) of each node in the tree.
+    """
+    X = np.ravel(grid[x])
+    Y = np.ravel(grid[y])
+    valid = np.flatnonzero(np.isfinite(X) & np.isfinite(Y))
+    points = np.stack([X[valid], Y[valid]], axis=-1)
+    scale = points.std(axis=0)
+    scale[scale == 0] = 1.
+
+    index = {'tree': cKDTree(points/scale), 'x': x, 'y': y, 'scale': scale,
+             'node': np.stack(np.unravel_index(valid, np.shape(grid[x])),
+                              axis=-1)}
+
+    return(index)
+
+def rpt_lookup(index, grid, x, y, workers=-1):
+    """
+    Assigns every sample to the nearest template node, with batched
+    queries of the KD-tree.
+
+    Parameters
+    ----------
+    index : dict
+        Index from rpt_index.
+    grid : dict
+        Template used to build the index.
+    x : array
+        Samples of the horizontal property (any shape).
+    y : array
+        Samples of the vertical property (same shape of x).
+    workers : integer
+        Number of threads of the query, -1 uses all the CPUs.
+
+    Returns
+    -------
+    phi : array
+        Porosity of the nearest node (NaN where x or y is NaN).
+    sw : array
+        Water saturation of the nearest node.
+    vsh : array
+        Shale volume of the nearest node.
+    dist : array
+        Distance to the node, in standard deviations of the template.
+    """
+    shape = np.shape(x)
+    points = np.stack([np.ravel(x), np.ravel(y)], axis=-1)/index['scale']
+    valid = np.all(np.isfinite(points), axis=1)
+
+    dist = np.full(points.shape[0], np.nan)
+    phi = np.full(points.shape[0], np.nan)
+    sw = np.full(points.shape[0], np.nan)
+    vsh = np.full(points.shape[0], np.nan)
+
+    d, i = index['tree'].query(points[valid], workers=workers)
+    node = index['node'][i]
+    dist[valid] = d
+    phi[valid] = grid['phi'][node[:, 0]]
+    sw[valid] = grid['sw'][node[:, 1]]
+    vsh[valid] = grid['vsh'][node[:, 2]]
+
+    return(phi.reshape(shape), sw.reshape(shape), vsh.reshape(shape),
+           dist.reshape(shape))
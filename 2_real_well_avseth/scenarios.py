@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:10:00 2026
+
+@author: Felipe
+
+Fluid and saturation scenarios: Gassmann fluid substitution for a grid of
+water saturations, hydrocarbons and fluid mixing laws computed at once,
+broadcasted over (law x hydrocarbon x saturation x depth).
+"""
+
+import numpy as np
+
+import avo_func2 as avo
+
+def fluid_mix(sw, k_b, k_hc, law='reuss', e=3.):
+    """
+    Computes the bulk modulus of a brine and hydrocarbon mixture.
+    Mavko et al., The rock physics handbook, 2009, Pages 174 and 465.
+
+    Parameters
+    ----------
+    sw : float or array
+        Water saturation in fraction.
+    k_b : float or array
+        Brine bulk modulus - GPa
+    k_hc : float or array
+        Hydrocarbon bulk modulus - GPa
+    law : str
+        'reuss' (Wood, uniform saturation), 'voigt' (patchy saturation) or
+        'brie' (Brie et al., 1995, between uniform and patchy).
+    e : float
+        Brie exponent. e=1 is the Voigt average and large values approach
+        the Reuss average.
+
+    Returns
+    -------
+    k_fl : float or array
+        Fluid mixture bulk modulus - GPa
+    """
+    if law == 'reuss':
+        k_fl = 1. / (sw/k_b + (1-sw)/k_hc)
+    elif law == 'voigt':
+        k_fl = sw*k_b + (1-sw)*k_hc
+    elif law == 'brie':
+        k_fl = (k_b-k_hc)*sw**e + k_hc
+    else:
+        raise ValueError("law must be 'reuss', 'voigt' or 'brie'")
+
+    return(k_fl)
+
+def sweep(vp1, vs1, rho1, phi, k0, k_f1, rho_f1, sw, hydrocarbons, k_b,
+          rho_b, laws=('reuss', 'voigt'), top=None, base=None, e=3.):
+    """
+    Gassmann fluid substitution of a log for every combination of mixing
+    law, hydrocarbon and water saturation, followed by the Shuey (1985)
+    intercept and gradient. There is no loop over the scenarios, all of them
+    are a single broadcast of avo.gassmann.
+
+    Parameters
+    ----------
+    vp1 : array
+        Initial P-wave velocity - m/s
+    vs1 : array
+        Initial S-wave velocity - m/s
+    rho1 : array
+        Initial density - g/cm3
+    phi : array
+        Porosity in fraction.
+    k0 : array
+        Mineral bulk modulus - GPa
+    k_f1 : array
+        Initial fluid bulk modulus - GPa
+    rho_f1 : array
+        Initial fluid density - g/cm3
+    sw : array
+        Water saturations of the scenarios, e.g. np.linspace(0, 1, 101).
+    hydrocarbons : dict
+        Bulk modulus (GPa) and density (g/cm3) of each hydrocarbon, e.g.
+        {'oil': (0.94, 0.78), 'gas': (0.06, 0.25)}.
+    k_b : float
+        Brine bulk modulus - GPa
+    rho_b : float
+        Brine density - g/cm3
+    laws : tuple
+        Mixing laws of fluid_mix.
+    top : integer
+        First sample of the reservoir. Outside top:base the logs are kept.
+        If None, the substitution is done in the whole log.
+    base : integer
+        Last sample (exclusive) of the reservoir.
+    e : float
+        Brie exponent.
+
+    Returns
+    -------
+    vp2 : 4D array
+        Final P-wave velocity (law x hydrocarbon x saturation x depth) - m/s
+    vs2 : 4D array
+        Final S-wave velocity (law x hydrocarbon x saturation x depth) - m/s
+    rho2 : 4D array
+        Final density (law x hydrocarbon x saturation x depth) - g/cm3
+    R0 : 4D array
+        Intercept (law x hydrocarbon x saturation x depth), same convention
+        of avo_func.shueyrc: R0[...,i] is the interface between the samples
+        i-1 and i, and R0[...,0] is a copy of R0[...,1].
+    G : 4D array
+        Gradient (law x hydrocarbon x saturation x depth).
+    """
+    sw = np.asarray(sw, dtype=float)[None, None, :, None]
+    k_hc = np.array([hydrocarbons[h][0] for h in hydrocarbons],
+                    dtype=float)[None, :, None, None]
+    rho_hc = np.array([hydrocarbons[h][1] for h in hydrocarbons],
+                      dtype=float)[None, :, None, None]
+
+    #(law x hydrocarbon x saturation x 1)
+    k_f2 = np.concatenate([fluid_mix(sw, k_b, k_hc, law, e) for law in laws])
+    rho_f2 = sw*rho_b + (1-sw)*rho_hc
+
+    vp2, vs2, rho2 = avo.gassmann(vp1, vs1, rho1, phi, k0, k_f1, rho_f1,
+                                  k_f2, rho_f2)
+
+    if top is not None or base is not None:
+        inside = np.zeros(np.shape(vp1), dtype=bool)
+        inside[top:base] = True
+        vp2 = np.where(inside, vp2, vp1)
+        vs2 = np.where(inside, vs2, vs1)
+        rho2 = np.where(inside, rho2, rho1)
+    shape = np.broadcast_shapes(vp2.shape, vs2.shape, rho2.shape)
+    vp2 = np.broadcast_to(vp2, shape)
+    vs2 = np.broadcast_to(vs2, shape)
+    rho2 = np.broadcast_to(rho2, shape)
+
+    R0, G, _, _ = avo.shuey(vp2[..., :-1], vs2[..., :-1], rho2[..., :-1],
+                            vp2[..., 1:], vs2[..., 1:], rho2[..., 1:], 0)
+    R0 = np.concatenate([R0[..., :1], R0], axis=-1)
+    G = np.concatenate([G[..., :1], G], axis=-1)
+
+    return(vp2, vs2, rho2, R0, G)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:30:00 2026
+
+@author: Felipe
+
+S-wave prediction for the wells without shear logs (well_1.las, well_3.las
+and well_4.las): Greenberg and Castagna (1992) for multi-mineral brine
+rocks, Han (1986) for shaly sands, and the iterative Greenberg-Castagna
+with Gassmann for hydrocarbon zones. All of them are broadcasts over whole
+logs with a fixed number of iterations, and several wells are completed in
+one call by concatenating their logs.
+Mavko et al., The rock physics handbook, 2009, Pages 516-519.
+"""
+
+import numpy as np
+
+import avo_func2 as avo2
+import scenarios
+
+#Greenberg and Castagna (1992) coefficients, Vs = a2*Vp**2 + a1*Vp + a0
+#in km/s, for brine-saturated rocks
+COEFFS = {'sandstone': (0., 0.80416, -0.85588),
+          'limestone': (-0.05508, 1.01677, -1.03049),
+          'dolomite': (0., 0.58321, -0.07775),
+          'shale': (0., 0.76969, -0.86735)}
+
+def greenberg_castagna(vp, volumes):
+    """
+    Computes the S-wave velocity of a brine-saturated multi-mineral rock:
+    average of the Voigt and Reuss averages of the single-lithology
+    regressions.
+
+    Parameters
+    ----------
+    vp : float or array
+        P-wave velocity (brine) - m/s
+    volumes : dict
+        Volume of each lithology of COEFFS, e.g. {'sandstone': 1-vsh,
+        'shale': vsh}. Normalized to add up to one.
+
+    Returns
+    -------
+    vs : float or array
+        S-wave velocity - m/s
+    """
+    vp = np.asarray(vp, dtype=float)/1000. #km/s
+    names = list(volumes)
+    X = np.array(np.broadcast_arrays(vp, *[volumes[n] for n in names])[1:],
+                 dtype=float)
+    X = X/X.sum(axis=0)
+    a = np.array([COEFFS[n] for n in names]).reshape((len(names), 3) +
+                                                     (1,)*vp.ndim)
+
+    vs_i = a[:, 0]*vp**2 + a[:, 1]*vp + a[:, 2] #(lithologies x samples)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vs = 0.5*((X*vs_i).sum(axis=0) + 1./(X/vs_i).sum(axis=0))
+
+    return(vs*1000)
+
+def han(phi, vclay):
+    """
+    Computes the S-wave velocity of brine-saturated shaly sandstones at 40
+    MPa with Han (1986), Vs = 3.52 - 4.91*phi - 1.89*C (km/s).
+
+    Parameters
+    ----------
+    phi : float or array
+        Porosity in fraction.
+    vclay : float or array
+        Clay volume in fraction.
+
+    Returns
+    -------
+    vs : float or array
+        S-wave velocity - m/s
+    """
+    return((3.52 - 4.91*phi - 1.89*vclay)*1000)
+
+def gc_gassmann(vp, rho, phi, volumes, k0, sw, k_b=2.8, rho_b=1.09,
+                k_hc=0.94, rho_hc=0.78, niter=5):
+    """
+    Computes the S-wave velocity of rocks with hydrocarbons by iterating
+    Greenberg-Castagna and Gassmann: the logs are substituted to brine with
+    the current Vs, Vs of the brine rock comes from greenberg_castagna and
+    goes back to the in-situ fluid (the shear modulus does not change with
+    the fluid). Every sample runs the same fixed number of iterations.
+
+    Parameters
+    ----------
+    vp : array
+        In-situ P-wave velocity - m/s
+    rho : array
+        In-situ density - g/cm3
+    phi : float or array
+        Porosity in fraction.
+    volumes : dict
+        Volume of each lithology, see greenberg_castagna.
+    k0 : float or array
+        Mineral bulk modulus - GPa, e.g. from avo_func2.vrh.
+    sw : float or array
+        Water saturation in fraction.
+    k_b : float
+        Brine bulk modulus - GPa
+    rho_b : float
+        Brine density - g/cm3
+    k_hc : float
+        Hydrocarbon bulk modulus - GPa
+    rho_hc : float
+        Hydrocarbon density - g/cm3
+    niter : integer
+        Number of iterations.
+
+    Returns
+    -------
+    vs : array
+        In-situ S-wave velocity - m/s
+    vp_b : array
+        P-wave velocity of the brine rock - m/s
+    vs_b : array
+        S-wave velocity of the brine rock - m/s
+    rho_b2 : array
+        Density of the brine rock - g/cm3
+    """
+    vp, rho, phi, sw = (np.asarray(a, dtype=float)
+                        for a in np.broadcast_arrays(vp, rho, phi, sw))
+    k_fl = scenarios.fluid_mix(sw, k_b, k_hc)
+    rho_fl = sw*rho_b + (1-sw)*rho_hc
+
+    vp_b, rho_b2 = vp, rho
+    vs = vs_b = greenberg_castagna(vp, volumes)
+    for _ in range(niter):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vp_b, _, rho_b2 = avo2.gassmann(vp, vs, rho, phi, k0, k_fl,
+                                            rho_fl, k_b, rho_b)
+        #samples where the substitution fails keep the brine estimate
+        bad = ~np.isfinite(vp_b)
+        vp_b = np.where(bad, vp, vp_b)
+        rho_b2 = np.where(bad, rho, rho_b2)
+        vs_b = greenberg_castagna(vp_b, volumes)
+        vs = vs_b*np.sqrt(rho_b2/rho)
+
+    return(vs, vp_b, vs_b, rho_b2)
+
+def shear_complete(wells, niter=5, **fluids):
+    """
+    Runs gc_gassmann for several wells in one call.
+
+    Parameters
+    ----------
+    wells : dict
+        Logs of each well: 'vp', 'rho', 'phi', 'sw', 'k0' (arrays or floats)
+        and 'volumes' (dict of the lithology volumes).
+    niter : integer
+        Number of iterations.
+    **fluids : float
+        k_b, rho_b, k_hc and rho_hc of gc_gassmann.
+
+    Returns
+    -------
+    vs : dict
+        Predicted in-situ S-wave velocity of each well - m/s
+    """
+    names = list(wells)
+    sizes = [np.size(wells[n]['vp']) for n in names]
+    cat = lambda get: np.concatenate([np.broadcast_to(get(wells[n]), s)
+                                      for n, s in zip(names, sizes)])
+    logs = {key: cat(lambda w: w[key])
+            for key in ('vp', 'rho', 'phi', 'sw', 'k0')}
+    lith = sorted({l for n in names for l in wells[n]['volumes']})
+    volumes = {l: cat(lambda w: w['volumes'].get(l, 0.)) for l in lith}
+
+    vs, _, _, _ = gc_gassmann(logs['vp'], logs['rho'], logs['phi'],
+                              volumes, logs['k0'], logs['sw'],
+                              niter=niter, **fluids)
+    vs = dict(zip(names, np.split(vs, np.cumsum(sizes)[:-1])))
+
+    return(vs)
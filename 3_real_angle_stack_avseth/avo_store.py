@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:05:00 2026
+
+@author: Felipe
+
+Chunked and compressed HDF5 store for angle stacks, gathers and AVO
+attribute cubes (intercept, gradient, fluid factor...) with the IL, XL, TWT
+and ANGLE coordinates and the metadata used to compute them.
+
+The file is written in SWMR mode (single writer, multiple readers), so other
+processes can read the cubes while they are being written.
+"""
+
+import json
+
+import numpy as np
+import h5py
+
+DIMS = ('IL', 'XL', 'TWT', 'ANGLE')
+
+def create_store(path, cubes, il, xl, twt, angle=None, wavelet=None,
+                 approximation=None, gassmann=None, chunks=None,
+                 dtype='float32', compression='gzip', compression_opts=4):
+    """
+    Creates the store with the coordinates, the metadata and the empty
+    cubes. All the cubes must be created here, SWMR does not allow new
+    datasets once the readers are attached.
+
+    Parameters
+    ----------
+    path : str
+        Path of the HDF5 file.
+    cubes : dict
+        Name of each cube and its dimensions, e.g. {'near': ('IL','XL','TWT'),
+        'gather': ('IL','XL','TWT','ANGLE')}.
+    il : array
+        Inlines.
+    xl : array
+        Crosslines.
+    twt : array
+        Two-way time - ms.
+    angle : array
+        Angles of incidence. Only needed for cubes with the ANGLE dimension.
+    wavelet : array
+        Wavelet used in the synthetics.
+    approximation : str
+        Reflectivity approximation, e.g. 'shuey 2 terms'.
+    gassmann : dict
+        Parameters of the Gassmann fluid substitution, e.g. {'k_b': 2.8,
+        'rho_b': 1.09, 'k_o': 0.94, 'rho_o': 0.78}.
+    chunks : dict
+        Chunk length for each dimension. The default (32 IL, 32 XL, 128 TWT
+        and all the angles) keeps reads along any axis cheap.
+    dtype : str or dict
+        Data type of the cubes, or of each cube, e.g. {'classes': 'uint8'}
+        (float32 for the cubes not given). The empty samples are NaN in
+        the float cubes and 0 in the integer ones.
+    compression : str
+        HDF5 compression filter.
+    compression_opts : integer
+        Level of the compression.
+    """
+    coords = {'IL': il, 'XL': xl, 'TWT': twt, 'ANGLE': angle}
+    size = {'IL': 32, 'XL': 32, 'TWT': 128, 'ANGLE': None}
+    size.update(chunks or {})
+
+    with h5py.File(path, 'w', libver='latest') as f:
+        for dim in DIMS:
+            if coords[dim] is not None:
+                f.create_dataset('coords/'+dim, data=np.asarray(coords[dim]))
+        if wavelet is not None:
+            f.create_dataset('wavelet', data=np.asarray(wavelet))
+        f.attrs['approximation'] = approximation or ''
+        f.attrs['gassmann'] = json.dumps(gassmann or {})
+
+        for name, dims in cubes.items():
+            shape = tuple(len(coords[d]) for d in dims)
+            chunk = tuple(min(size[d] or n, n) for d, n in zip(dims, shape))
+            dt = np.dtype(dtype.get(name, 'float32')
+                          if isinstance(dtype, dict) else dtype)
+            dset = f.create_dataset('cubes/'+name, shape=shape, dtype=dt,
+                                    chunks=chunk, compression=compression,
+                                    compression_opts=compression_opts,
+                                    shuffle=True,
+                                    fillvalue=np.nan if dt.kind in 'fc'
+                                    else 0)
+            dset.attrs['dims'] = ','.join(dims)
+
+def open_writer(path):
+    """
+    Opens the store to write in SWMR mode.
+
+    Parameters
+    ----------
+    path : str
+        Path of the HDF5 file created by create_store.
+
+    Returns
+    -------
+    f : h5py.File
+        Open file. Close it (or use it in a with block) when done.
+    """
+    f = h5py.File(path, 'r+', libver='latest')
+    f.swmr_mode = True
+
+    return(f)
+
+def _check_dims(name, dims, sel):
+    """
+    Raises KeyError for a selection that is not a dimension of the cube.
+    """
+    unknown = sorted(set(sel) - set(dims))
+    if unknown:
+        raise KeyError('%s not in the dimensions of %s (%s)'
+                       % (', '.join(unknown), name, ', '.join(dims)))
+
+def write_block(f, name, data, **index):
+    """
+    Writes a block of a cube and flushes it, so the readers see it.
+
+    Parameters
+    ----------
+    f : h5py.File
+        File from open_writer.
+    name : str
+        Name of the cube.
+    data : array
+        Block to write.
+    **index : slice or integer
+        Sample index for each dimension, e.g. IL=slice(0, 10). The
+        dimensions not given are written in full.
+    """
+    dset = f['cubes/'+name]
+    dims = dset.attrs['dims'].split(',')
+    _check_dims(name, dims, index)
+    key = tuple(index.get(d, slice(None)) for d in dims)
+    dset[key] = data
+    dset.flush()
+
+def coord_index(coord, sel):
+    """
+    Converts a selection in coordinate values to a selection in samples.
+
+    Parameters
+    ----------
+    coord : array
+        Coordinate of a dimension (increasing).
+    sel : value, slice, list or None
+        Selection in coordinate values: the nearest sample of a value, the
+        samples inside a slice of values or the nearest samples of a list.
+        None selects all the samples.
+
+    Returns
+    -------
+    index : integer, slice or list
+        Selection in samples.
+    """
+    if sel is None:
+        return(slice(None))
+    if isinstance(sel, slice):
+        start = None if sel.start is None else \
+                int(np.searchsorted(coord, sel.start, side='left'))
+        stop = None if sel.stop is None else \
+               int(np.searchsorted(coord, sel.stop, side='right'))
+        return(slice(start, stop))
+    if np.ndim(sel) == 0:
+        return(int(np.abs(coord - sel).argmin()))
+    #increasing samples, as in the cube
+    return(sorted(int(np.abs(coord - s).argmin()) for s in sel))
+
+def read_metadata(path):
+    """
+    Reads the coordinates and the metadata of the store.
+
+    Parameters
+    ----------
+    path : str
+        Path of the HDF5 file.
+
+    Returns
+    -------
+    meta : dict
+        Coordinates, wavelet, approximation, Gassmann parameters and the
+        dimensions of each cube.
+    """
+    with h5py.File(path, 'r', libver='latest', swmr=True) as f:
+        meta = {'coords': {d: f['coords/'+d][()] for d in f['coords']},
+                'wavelet': f['wavelet'][()] if 'wavelet' in f else None,
+                'approximation': f.attrs['approximation'],
+                'gassmann': json.loads(f.attrs['gassmann']),
+                'cubes': {n: tuple(f['cubes/'+n].attrs['dims'].split(','))
+                          for n in f['cubes']}}
+
+    return(meta)
+
+def read_cube(path, name, as_xarray=False, **sel):
+    """
+    Reads a cube or a part of it. Only the chunks touched by the selection
+    are read and decompressed.
+
+    Parameters
+    ----------
+    path : str
+        Path of the HDF5 file.
+    name : str
+        Name of the cube.
+    as_xarray : bool
+        If True, returns a xarray.DataArray with the coordinates.
+    **sel : value, slice or list
+        Selection in coordinate values for each dimension, e.g. IL=1376,
+        TWT=slice(1900, 2200). Works like xarray .sel with nearest values.
+
+    Returns
+    -------
+    data : array or xarray.DataArray
+        The selected samples.
+    coords : dict
+        Coordinates of the selected samples (only if as_xarray is False).
+
+    Raises
+    ------
+    KeyError
+        If a selection is not a dimension of the cube.
+    """
+    with h5py.File(path, 'r', libver='latest', swmr=True) as f:
+        dset = f['cubes/'+name]
+        dset.refresh()
+        dims = dset.attrs['dims'].split(',')
+        _check_dims(name, dims, sel)
+        key = []
+        take = []
+        coords = []
+        for d in dims:
+            coord = f['coords/'+d][()]
+            idx = coord_index(coord, sel.get(d))
+            if isinstance(idx, list):
+                #read the bounding slice and pick the samples in memory
+                key.append(slice(idx[0], idx[-1]+1))
+                take.append((len(coords), [i-idx[0] for i in idx]))
+            else:
+                key.append(idx)
+            if not isinstance(idx, int):
+                coords.append((d, coord[idx]))
+        data = dset[tuple(key)]
+        for axis, rel in take:
+            data = np.take(data, rel, axis=axis)
+
+    if as_xarray:
+        import xarray as xr
+        return(xr.DataArray(data, coords))
+
+    return(data, dict(coords))
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:55:00 2026
+
+@author: Felipe
+
+Spectral balancing of the far stack to the near stack before the intercept
+and gradient: least-squares (Wiener) shaping filters that turn the far
+traces into the near ones are designed on tiles of traces, and each far
+trace is convolved with the bilinear interpolation of the filters of the
+nearest tiles, so the filters change smoothly across the survey. Both steps
+run in blocks of inlines in a thread pool, with one batched FFT per block.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+def next_pow2(n):
+    """
+    Power of two not smaller than n, e.g. the length of a fast FFT of n
+    samples.
+
+    Parameters
+    ----------
+    n : integer
+        Number of samples.
+
+    Returns
+    -------
+    nfft : integer
+        Power of two.
+    """
+    return(1 << int(np.ceil(np.log2(n))))
+
+def _shaping_filter(near, far, length, eps):
+    """
+    Least-squares shaping filter (far -> near) of a set of traces, from the
+    average cross and auto spectra, truncated to length samples.
+    """
+    ns = near.shape[-1]
+    nfft = next_pow2(2*ns)
+    N = np.fft.rfft(near, nfft, axis=-1)
+    F = np.fft.rfft(far, nfft, axis=-1)
+    cross = np.mean(N*np.conj(F), axis=0)
+    auto = np.mean(np.abs(F)**2, axis=0)
+
+    h = np.fft.irfft(cross/(auto + eps*auto.mean()), nfft)
+    #causal and anti-causal lags around the center of the filter
+    h = np.roll(h, length//2)[:length]*np.hanning(length+2)[1:-1]
+
+    return(h)
+
+def _tiles(n, size):
+    """
+    Edges and centers of the tiles along one axis.
+    """
+    edges = np.arange(0, n, size)
+    stops = np.minimum(edges + size, n)
+
+    return(edges, stops, (edges + stops - 1)/2.)
+
+def design_filters(near, far, tile=(32, 32), length=64, eps=0.01,
+                   window=None, workers=None):
+    """
+    Designs one shaping filter (far -> near) for each tile of traces.
+
+    Parameters
+    ----------
+    near : array
+        Near stack (IL x XL x TWT), a NumPy array, a memory map or an HDF5
+        dataset.
+    far : array
+        Far stack (IL x XL x TWT).
+    tile : tuple
+        Size of the tiles in inlines and crosslines.
+    length : integer
+        Length of the filters in samples.
+    eps : float
+        White noise added to the far spectrum, relative to its mean.
+    window : tuple
+        First and last (excluded) samples used in the design, e.g. around
+        the target. If None, the whole traces.
+    workers : integer
+        Number of threads.
+
+    Returns
+    -------
+    filters : dict
+        'h' (tiles IL x tiles XL x length), 'il' and 'xl' (centers of the
+        tiles in samples of the cube).
+    """
+    nil, nxl, ns = near.shape
+    k0, k1 = window or (0, ns)
+    e_il, s_il, c_il = _tiles(nil, tile[0])
+    e_xl, s_xl, c_xl = _tiles(nxl, tile[1])
+    taper = np.hanning(k1-k0)
+
+    def row(i):
+        n = np.asarray(near[e_il[i]:s_il[i], :, k0:k1], dtype=float)*taper
+        f = np.asarray(far[e_il[i]:s_il[i], :, k0:k1], dtype=float)*taper
+        return([_shaping_filter(
+                    n[:, e_xl[j]:s_xl[j]].reshape(-1, k1-k0),
+                    f[:, e_xl[j]:s_xl[j]].reshape(-1, k1-k0), length, eps)
+                for j in range(len(e_xl))])
+
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        h = np.array(list(pool.map(row, range(len(e_il)))))
+
+    return({'h': h, 'il': c_il, 'xl': c_xl})
+
+def _interp(h, centers, positions):
+    """
+    Linear interpolation of the filters of the tiles (first axis) at the
+    positions, in samples of the cube.
+    """
+    pos = np.interp(positions, centers, np.arange(centers.size))
+    i0 = np.floor(pos).astype(int)
+    i1 = np.minimum(i0+1, centers.size-1)
+    w = (pos - i0).reshape((-1,) + (1,)*(h.ndim-1))
+
+    return((1-w)*h[i0] + w*h[i1])
+
+def apply_filters(far, filters, chunk=32, out=None, workers=None):
+    """
+    Convolves every far trace with its shaping filter, bilinearly
+    interpolated between the centers of the tiles.
+
+    Parameters
+    ----------
+    far : array
+        Far stack (IL x XL x TWT).
+    filters : dict
+        Filters from design_filters.
+    chunk : integer
+        Number of inlines of each block.
+    out : array
+        Output array with the shape of the far stack (e.g. a memory map or
+        an HDF5 dataset). If None, it is created in memory (float32).
+    workers : integer
+        Number of threads.
+
+    Returns
+    -------
+    out : array
+        Balanced far stack.
+    """
+    nil, nxl, ns = far.shape
+    h = filters['h']
+    length = h.shape[-1]
+    nfft = next_pow2(ns + length - 1)
+    if out is None:
+        out = np.zeros(far.shape, dtype=np.float32)
+
+    #filters at every crossline, then at the inlines of each block
+    h_xl = _interp(np.swapaxes(h, 0, 1), filters['xl'], np.arange(nxl))
+    h_xl = np.swapaxes(h_xl, 0, 1) #(tiles IL x XL x length)
+
+    def block(start):
+        sl = slice(start, min(start+chunk, nil))
+        hb = _interp(h_xl, filters['il'], np.arange(sl.start, sl.stop))
+
+        spec = np.fft.rfft(np.asarray(far[sl], dtype=float), nfft, axis=-1)
+        spec *= np.fft.rfft(hb, nfft, axis=-1)
+        conv = np.fft.irfft(spec, nfft, axis=-1)
+        out[sl] = conv[..., length//2:length//2+ns]
+
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        list(pool.map(block, range(0, nil, chunk)))
+
+    return(out)
+
+def balance(near, far, tile=(32, 32), length=64, eps=0.01, window=None,
+            chunk=32, out=None, workers=None):
+    """
+    Designs the shaping filters and balances the far stack, ready for
+    ig_attributes.intercept_gradient or classify_cubes.
+
+    Parameters
+    ----------
+    near : array
+        Near stack (IL x XL x TWT).
+    far : array
+        Far stack (IL x XL x TWT).
+    tile : tuple
+        Size of the tiles in inlines and crosslines.
+    length : integer
+        Length of the filters in samples.
+    eps : float
+        White noise of the design, relative to the mean far spectrum.
+    window : tuple
+        First and last (excluded) samples used in the design.
+    chunk : integer
+        Number of inlines of each block.
+    out : array
+        Output array with the shape of the far stack.
+    workers : integer
+        Number of threads.
+
+    Returns
+    -------
+    far_b : array
+        Balanced far stack.
+    filters : dict
+        Filters from design_filters.
+    """
+    filters = design_filters(near, far, tile, length, eps, window, workers)
+    far_b = apply_filters(far, filters, chunk, out, workers)
+
+    return(far_b, filters)
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:35:00 2026
+
+@author: Felipe
+
+Intercept and gradient from the near and far stacks (two-term Shuey, as in
+1_AVO_attributes_real_angle_stack_avseth.ipynb), AVO classes of every sample
+relative to the background trend of the I-G crossplot, chi projections
+(extended elastic impedance) and anomaly maps along a horizon. The cubes are
+processed in blocks of inlines, so near, far and the outputs can be memory
+maps or HDF5 datasets of the whole survey.
+
+Class codes (uint8): 0 background, 1 class I, 2 class II, 3 class IIp,
+4 class III and 5 class IV (Castagna and Swan, 1997).
+"""
+
+import numpy as np
+
+BACKGROUND, CLASS_I, CLASS_II, CLASS_IIP, CLASS_III, CLASS_IV = range(6)
+NAMES = ('background', 'I', 'II', 'IIp', 'III', 'IV')
+
+def intercept_gradient(near, far, angle_n=5., angle_f=25.):
+    """
+    Computes the intercept and the gradient from two angle stacks with the
+    two-term Shuey approximation R = I + G*sin^2.
+
+    Parameters
+    ----------
+    near : array
+        Near stack.
+    far : array
+        Far stack.
+    angle_n : float
+        Mean angle of the near stack - degrees
+    angle_f : float
+        Mean angle of the far stack - degrees
+
+    Returns
+    -------
+    I : array
+        Intercept.
+    G : array
+        Gradient.
+    """
+    s_n = np.sin(np.radians(angle_n))**2
+    s_f = np.sin(np.radians(angle_f))**2
+
+    G = (far - near)/(s_f - s_n)
+    I = near - G*s_n
+
+    return(I, G)
+
+def fluid_factor(I, G, m):
+    """
+    Fluid factor of the notebooks, I - m*G with m the slope of the
+    background trend.
+    """
+    return(I - m*G)
+
+def fit_background(I, G, nsamples=1000000, seed=0):
+    """
+    Fits the background trend G = b + m*I of the I-G crossplot with a
+    random subset of the samples, and the spread around it.
+
+    Parameters
+    ----------
+    I : array
+        Intercept (e.g. of a zoom of the survey around the target).
+    G : array
+        Gradient.
+    nsamples : integer
+        Largest number of samples used in the fit.
+    seed : integer
+        Seed of the random subset.
+
+    Returns
+    -------
+    background : dict
+        'b' and 'm' of the trend, 'sigma' (robust standard deviation of
+        the distance of the samples to the trend) and 'sigma_i' (robust
+        standard deviation of the intercept).
+    """
+    I = np.ravel(I)
+    G = np.ravel(G)
+    valid = np.flatnonzero(np.isfinite(I) & np.isfinite(G))
+    if valid.size > nsamples:
+        rng = np.random.default_rng(seed)
+        valid = np.sort(rng.choice(valid, nsamples, replace=False))
+    I = I[valid].astype(float)
+    G = G[valid].astype(float)
+
+    b, m = np.polynomial.polynomial.polyfit(I, G, 1)
+    dist = (G - b - m*I)/np.sqrt(1 + m**2)
+    mad = lambda x: 1.4826*np.median(np.abs(x - np.median(x)))
+    background = {'b': b, 'm': m, 'sigma': mad(dist), 'sigma_i': mad(I)}
+
+    return(background)
+
+def sample_traces(ntraces, ns, nsamples=1000000, seed=0):
+    """
+    Random traces of a survey with about nsamples samples in total.
+
+    Parameters
+    ----------
+    ntraces : integer
+        Number of traces of the survey (IL*XL).
+    ns : integer
+        Number of samples of each trace.
+    nsamples : integer
+        Number of samples wanted.
+    seed : integer
+        Seed of the random subset.
+
+    Returns
+    -------
+    traces : array
+        Sorted indices of the traces, from 0 to ntraces-1.
+    """
+    count = min(max(-(-nsamples//ns), 1), ntraces)
+    rng = np.random.default_rng(seed)
+
+    return(np.sort(rng.choice(ntraces, count, replace=False)))
+
+def sample_background(near, far, angle_n=5., angle_f=25., nsamples=1000000,
+                      seed=0):
+    """
+    Fits the background trend (fit_background) with random traces of the
+    whole survey, read one by one, so the stacks can be memory maps or
+    HDF5 datasets larger than the memory.
+
+    Parameters
+    ----------
+    near : array
+        Near stack (IL x XL x TWT).
+    far : array
+        Far stack (IL x XL x TWT).
+    angle_n : float
+        Mean angle of the near stack - degrees
+    angle_f : float
+        Mean angle of the far stack - degrees
+    nsamples : integer
+        Approximate number of samples used in the fit.
+    seed : integer
+        Seed of the random subset.
+
+    Returns
+    -------
+    background : dict
+        Trend from fit_background.
+    """
+    nil, nxl, ns = near.shape
+    traces = sample_traces(nil*nxl, ns, nsamples, seed)
+    rows = [divmod(int(t), nxl) for t in traces]
+    n = np.array([near[i, j] for i, j in rows], dtype=np.float32)
+    f = np.array([far[i, j] for i, j in rows], dtype=np.float32)
+    I, G = intercept_gradient(n, f, angle_n, angle_f)
+
+    return(fit_background(I, G, nsamples, seed))
+
+def avo_class(I, G, background, k=2., i0=0.5):
+    """
+    AVO class of each sample. Only the samples below the background trend
+    by more than k*sigma are classified (tops of the softer, hydrocarbon
+    layers); the others are background. The bases can be classified with
+    avo_class(-I, -G, ...).
+
+    Parameters
+    ----------
+    I : array
+        Intercept.
+    G : array
+        Gradient.
+    background : dict
+        Trend from fit_background.
+    k : float
+        Distance to the trend, in sigma, of the anomalies.
+    i0 : float
+        Intercept, in sigma_i, that separates the small intercepts
+        (classes II and IIp) from classes I and III.
+
+    Returns
+    -------
+    classes : array
+        Class code of each sample (uint8).
+    """
+    b, m = background['b'], background['m']
+    i0 = i0*background['sigma_i']
+    with np.errstate(invalid='ignore'):
+        dist = (G - b - m*I)/np.sqrt(1 + m**2)
+        anomaly = dist < -k*background['sigma']
+        neg = G < 0
+
+        classes = np.select(
+            [~anomaly, ~neg & (I < 0), ~neg, I >= i0, I > 0, I > -i0],
+            [BACKGROUND, CLASS_IV, BACKGROUND, CLASS_I, CLASS_IIP, CLASS_II],
+            CLASS_III).astype(np.uint8)
+
+    return(classes)
+
+def classify_cubes(near, far, background=None, angle_n=5., angle_f=25.,
+                   k=2., i0=0.5, chunk=32, out=None):
+    """
+    Computes the intercept, gradient, fluid factor and AVO classes of the
+    whole survey in blocks of inlines.
+
+    Parameters
+    ----------
+    near : array
+        Near stack (IL x XL x TWT), a NumPy array, a memory map or an HDF5
+        dataset.
+    far : array
+        Far stack (IL x XL x TWT).
+    background : dict
+        Trend from fit_background. If None, it is fitted with random
+        traces of the whole survey (sample_background).
+    angle_n : float
+        Mean angle of the near stack - degrees
+    angle_f : float
+        Mean angle of the far stack - degrees
+    k : float
+        Distance to the trend of the anomalies, see avo_class.
+    i0 : float
+        Small intercept threshold, see avo_class.
+    chunk : integer
+        Number of inlines of each block.
+    out : dict
+        Output arrays 'classes' (uint8) and optionally 'I', 'G' and
+        'fluid' with the shape of the stacks, e.g. memory maps or HDF5
+        datasets. If None, 'classes' is created in memory.
+
+    Returns
+    -------
+    out : dict
+        The output arrays and the 'background' used.
+    """
+    out = dict(out or {})
+    if 'classes' not in out:
+        out['classes'] = np.zeros(near.shape, dtype=np.uint8)
+    if background is None:
+        background = sample_background(near, far, angle_n, angle_f)
+
+    for start in range(0, near.shape[0], chunk):
+        sl = slice(start, min(start+chunk, near.shape[0]))
+        n = np.asarray(near[sl], dtype=np.float32)
+        f = np.asarray(far[sl], dtype=np.float32)
+        I, G = intercept_gradient(n, f, angle_n, angle_f)
+
+        out['classes'][sl] = avo_class(I, G, background, k, i0)
+        if 'I' in out:
+            out['I'][sl] = I
+        if 'G' in out:
+            out['G'][sl] = G
+        if 'fluid' in out:
+            out['fluid'][sl] = fluid_factor(I, G, background['m'])
+    out['background'] = background
+
+    return(out)
+
+def chi_projection(I, G, chi, chunk=32, out=None):
+    """
+    Projects the intercept and gradient cubes on a chi angle, the
+    reflectivity of the extended elastic impedance, I*cos(chi) + G*sin(chi)
+    (Whitcombe et al., 2002). The chi can come from impedance.eei_correlation
+    at the wells. Computed in blocks of inlines.
+
+    Parameters
+    ----------
+    I : array
+        Intercept (IL x XL x TWT), a NumPy array, a memory map or an HDF5
+        dataset.
+    G : array
+        Gradient (IL x XL x TWT).
+    chi : float
+        Chi angle - degrees
+    chunk : integer
+        Number of inlines of each block.
+    out : array
+        Output array with the shape of the cubes. If None, it is created in
+        memory (float32).
+
+    Returns
+    -------
+    out : array
+        Chi projection.
+    """
+    chi = np.radians(chi)
+    c, s = np.cos(chi), np.sin(chi)
+    if out is None:
+        out = np.zeros(I.shape, dtype=np.float32)
+
+    for start in range(0, I.shape[0], chunk):
+        sl = slice(start, min(start+chunk, I.shape[0]))
+        out[sl] = c*np.asarray(I[sl], dtype=np.float32) + \
+                  s*np.asarray(G[sl], dtype=np.float32)
+
+    return(out)
+
+def grid_horizon(il, xl, z, inlines, crosslines):
+    """
+    Grids a horizon given as (il, xl, z) points, like Top_Heimdal_subset.txt,
+    on the inlines and crosslines of the survey.
+
+    Parameters
+    ----------
+    il : array
+        Inline of each point.
+    xl : array
+        Crossline of each point.
+    z : array
+        Two-way time of each point - ms
+    inlines : array
+        Inlines of the survey.
+    crosslines : array
+        Crosslines of the survey.
+
+    Returns
+    -------
+    horizon : 2D array
+        Two-way time (IL x XL), NaN where the horizon is not picked.
+    """
+    inlines = np.asarray(inlines)
+    crosslines = np.asarray(crosslines)
+    i = np.searchsorted(inlines, il)
+    j = np.searchsorted(crosslines, xl)
+    keep = (i < inlines.size) & (j < crosslines.size)
+    keep[keep] &= (inlines[i[keep]] == np.asarray(il)[keep]) & \
+                  (crosslines[j[keep]] == np.asarray(xl)[keep])
+
+    horizon = np.full((inlines.size, crosslines.size), np.nan)
+    horizon[i[keep], j[keep]] = np.asarray(z)[keep]
+
+    return(horizon)
+
+def anomaly_maps(classes, twt, horizon, window=(-8., 24.), attribute=None,
+                 chunk=32):
+    """
+    Anomaly maps in a window along a horizon: dominant AVO class, fraction
+    of anomalous samples, number of samples of each class and, optionally,
+    the minimum of an attribute (e.g. the fluid factor).
+
+    Parameters
+    ----------
+    classes : array
+        Class cube (IL x XL x TWT) from classify_cubes.
+    twt : array
+        Two-way time of the cube - ms
+    horizon : 2D array
+        Two-way time of the horizon (IL x XL), e.g. from grid_horizon.
+    window : tuple
+        Top and base of the window relative to the horizon - ms
+    attribute : array
+        Attribute cube (IL x XL x TWT).
+    chunk : integer
+        Number of inlines of each block.
+
+    Returns
+    -------
+    maps : dict
+        'dominant' (most frequent anomalous class, 0 if none), 'fraction'
+        (fraction of anomalous samples), 'count' (IL x XL x class) and
+        'attribute' (minimum in the window) when given. Traces without the
+        horizon are 0 (NaN for the float maps).
+    """
+    twt = np.asarray(twt, dtype=float)
+    dt = twt[1] - twt[0]
+    offsets = np.arange(int(round(window[0]/dt)), int(round(window[1]/dt))+1)
+    nil, nxl, ns = classes.shape
+
+    count = np.zeros((nil, nxl, len(NAMES)), dtype=np.int32)
+    attr = np.full((nil, nxl), np.nan) if attribute is not None else None
+    for start in range(0, nil, chunk):
+        sl = slice(start, min(start+chunk, nil))
+        h = horizon[sl]
+        picked = np.isfinite(h)
+        k0 = np.rint((np.where(picked, h, twt[0]) - twt[0])/dt).astype(int)
+        idx = k0[..., None] + offsets
+        inside = picked[..., None] & (idx >= 0) & (idx < ns)
+        idx = np.clip(idx, 0, ns-1)
+
+        c = np.take_along_axis(np.asarray(classes[sl]), idx, axis=-1)
+        c = np.where(inside, c, len(NAMES))
+        for code in range(len(NAMES)):
+            count[sl, :, code] = (c == code).sum(axis=-1)
+        if attribute is not None:
+            a = np.take_along_axis(np.asarray(attribute[sl], dtype=float),
+                                   idx, axis=-1)
+            a = np.where(inside & np.isfinite(a), a, np.inf).min(axis=-1)
+            attr[sl] = np.where(np.isfinite(a), a, np.nan)
+
+    total = count.sum(axis=-1)
+    anomalous = count[..., 1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(total > 0, anomalous.sum(axis=-1)/total, np.nan)
+    dominant = np.where(anomalous.sum(axis=-1) > 0,
+                        anomalous.argmax(axis=-1) + 1, 0).astype(np.uint8)
+
+    maps = {'dominant': dominant, 'fraction': fraction, 'count': count}
+    if attribute is not None:
+        maps['attribute'] = attr
+
+    return(maps)
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:15:00 2026
+
+@author: Felipe
+
+Streaming of the near and far stacks to the intercept, gradient and fluid
+factor cubes. A reader thread reads the next blocks of inlines (SEG-Y with
+segyio, or any sliceable array) into a bounded queue while the current
+block is computed with ig_attributes and written to an avo_store file, so
+the reads from slow (network) disks are hidden behind the compute and only
+a few blocks are in memory.
+
+    bg = pipeline.run('3d_nearstack.sgy', '3d_farstack.sgy', 'avo.h5',
+                      byte_il=41, byte_xl=21,
+                      coords={'IL': inlines, 'TWT': twt})
+"""
+
+import json
+import queue
+import threading
+
+import numpy as np
+import h5py
+
+import avo_store
+import ig_attributes as iga
+
+_DONE = object()
+
+def prefetch(blocks, depth=2):
+    """
+    Runs an iterator in a thread, at most depth items ahead of the
+    consumer. An exception of the iterator is raised in the consumer.
+
+    Parameters
+    ----------
+    blocks : iterable
+        Items to read, e.g. from segy_blocks.
+    depth : integer
+        Size of the queue.
+
+    Yields
+    ------
+    item
+        The items of blocks, in order.
+    """
+    q = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        #gives up when the consumer is gone
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return(True)
+            except queue.Full:
+                pass
+        return(False)
+
+    def reader():
+        try:
+            for item in blocks:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(e)
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+def read_geometry(path, byte_il=189, byte_xl=193):
+    """
+    Reads the inlines, crosslines and samples of a SEG-Y file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SEG-Y file.
+    byte_il : integer
+        Byte of the inline number in the trace header.
+    byte_xl : integer
+        Byte of the crossline number in the trace header.
+
+    Returns
+    -------
+    coords : dict
+        'IL', 'XL' and 'TWT' (samples of the file).
+    """
+    import segyio
+
+    with segyio.open(path, iline=byte_il, xline=byte_xl) as f:
+        coords = {'IL': np.array(f.ilines), 'XL': np.array(f.xlines),
+                  'TWT': np.array(f.samples)}
+
+    return(coords)
+
+def segy_blocks(path, chunk=32, byte_il=189, byte_xl=193):
+    """
+    Reads a SEG-Y cube in blocks of inlines.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SEG-Y file.
+    chunk : integer
+        Number of inlines of each block.
+    byte_il : integer
+        Byte of the inline number in the trace header.
+    byte_xl : integer
+        Byte of the crossline number in the trace header.
+
+    Yields
+    ------
+    sl : slice
+        Inlines of the block, in samples of the cube.
+    block : array
+        Block (inlines x XL x TWT), float32.
+    """
+    import segyio
+
+    with segyio.open(path, iline=byte_il, xline=byte_xl) as f:
+        ilines = f.ilines
+        for start in range(0, len(ilines), chunk):
+            sl = slice(start, min(start+chunk, len(ilines)))
+            block = np.stack([f.iline[il] for il in ilines[sl]])
+            yield(sl, block.astype(np.float32))
+
+def segy_traces(path, traces):
+    """
+    Reads traces of a SEG-Y file by their index in the file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SEG-Y file.
+    traces : array
+        Indices of the traces, e.g. from ig_attributes.sample_traces.
+
+    Returns
+    -------
+    data : array
+        Traces (traces x TWT), float32.
+    """
+    import segyio
+
+    with segyio.open(path, ignore_geometry=True) as f:
+        data = np.array([f.trace[int(t)] for t in traces], dtype=np.float32)
+
+    return(data)
+
+def array_blocks(data, chunk=32):
+    """
+    Reads a cube (array, memory map or HDF5 dataset) in blocks of inlines,
+    as segy_blocks.
+    """
+    for start in range(0, data.shape[0], chunk):
+        sl = slice(start, min(start+chunk, data.shape[0]))
+        yield(sl, np.asarray(data[sl], dtype=np.float32))
+
+def run(near, far, path, background=None, angle_n=5., angle_f=25.,
+        chunk=32, depth=2, coords=None, byte_il=189, byte_xl=193):
+    """
+    Computes the intercept, gradient and fluid factor of the whole survey
+    block by block, reading the next blocks of both stacks while the
+    current one is computed and written.
+
+    Parameters
+    ----------
+    near : str or array
+        Near stack, a SEG-Y path or an array (IL x XL x TWT) like a memory
+        map or an HDF5 dataset.
+    far : str or array
+        Far stack, same kind and geometry as near.
+    path : str
+        Path of the avo_store file created with the cubes 'I', 'G' and
+        'fluid'.
+    background : dict
+        Trend from ig_attributes.fit_background. If None, it is fitted
+        with random traces of the whole survey before the blocks.
+    angle_n : float
+        Mean angle of the near stack - degrees
+    angle_f : float
+        Mean angle of the far stack - degrees
+    chunk : integer
+        Number of inlines of each block.
+    depth : integer
+        Number of blocks read ahead.
+    coords : dict
+        'IL', 'XL' and 'TWT' of the store, each one replacing the geometry
+        of the SEG-Y file (e.g. the TWT of the notebooks, samples + 1500).
+        Required for the arrays.
+    byte_il : integer
+        Byte of the inline number in the SEG-Y trace headers.
+    byte_xl : integer
+        Byte of the crossline number in the SEG-Y trace headers.
+
+    Returns
+    -------
+    background : dict
+        Trend used in the fluid factor, also saved in the attributes of
+        the store.
+
+    Raises
+    ------
+    ValueError
+        If the near and far stacks do not have the same geometry, if the
+        coords of arrays are missing or if the size of a coordinate does
+        not match the stacks.
+    """
+    dims = ('IL', 'XL', 'TWT')
+    coords = dict(coords or {})
+    if isinstance(near, str):
+        geometry = read_geometry(near, byte_il, byte_xl)
+        shapes = [tuple(g[d].size for d in dims) for g in
+                  (geometry, read_geometry(far, byte_il, byte_xl))]
+        coords = {d: coords.get(d, geometry[d]) for d in geometry}
+        readers = (segy_blocks(near, chunk, byte_il, byte_xl),
+                   segy_blocks(far, chunk, byte_il, byte_xl))
+    else:
+        missing = [d for d in dims if d not in coords]
+        if missing:
+            raise ValueError('coords %s are required for arrays'
+                             % ', '.join(missing))
+        shapes = [tuple(near.shape), tuple(far.shape)]
+        readers = (array_blocks(near, chunk), array_blocks(far, chunk))
+    if shapes[0] != shapes[1]:
+        raise ValueError('near %s and far %s stacks have different shapes'
+                         % tuple(shapes))
+    for d, size in zip(dims, shapes[0]):
+        if np.size(coords[d]) != size:
+            raise ValueError('%s has %d values, the stacks have %d'
+                             % (d, np.size(coords[d]), size))
+    blocks = zip(*readers, strict=True)
+
+    if background is None and isinstance(near, str):
+        traces = iga.sample_traces(shapes[0][0]*shapes[0][1], shapes[0][2])
+        I, G = iga.intercept_gradient(segy_traces(near, traces),
+                                      segy_traces(far, traces),
+                                      angle_n, angle_f)
+        background = iga.fit_background(I, G)
+    elif background is None:
+        background = iga.sample_background(near, far, angle_n, angle_f)
+
+    avo_store.create_store(path, {n: dims for n in ('I', 'G', 'fluid')},
+                           coords['IL'], coords['XL'], coords['TWT'],
+                           approximation='shuey 2 terms')
+
+    with avo_store.open_writer(path) as f:
+        for (sl, n), (_, fa) in prefetch(blocks, depth):
+            I, G = iga.intercept_gradient(n, fa, angle_n, angle_f)
+            avo_store.write_block(f, 'I', I, IL=sl)
+            avo_store.write_block(f, 'G', G, IL=sl)
+            avo_store.write_block(f, 'fluid',
+                                  iga.fluid_factor(I, G, background['m']),
+                                  IL=sl)
+
+    #attributes cannot be written in SWMR mode
+    with h5py.File(path, 'r+', libver='latest') as f:
+        f.attrs['angles'] = [angle_n, angle_f]
+        f.attrs['background'] = json.dumps({k: float(v) for k, v in
+                                            background.items()})
+
+    return(background)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:55:00 2026
+
+@author: Felipe
+
+Multi-resolution pyramid of the near, far and attribute cubes for display.
+Each level is an avo_store file (<base>_L0.h5, <base>_L1.h5, ...) decimated
+by 2 in IL, XL and TWT from the previous one, after a binomial anti-alias
+filter, with the robust amplitude limits (percentiles, like robust=True of
+xarray plots) of each cube. read_slice reads an inline, crossline or time
+slice from the coarsest level that still has the screen resolution.
+
+    pyramid.build_pyramid('stacks', {'near': data_n, 'far': data_f},
+                          inlines, crosslines, twt)
+    da, info = pyramid.read_slice('stacks', 'near', as_xarray=True, IL=1376)
+    da.plot.imshow(x='XL', y='TWT', yincrease=False,
+                   vmin=info['clip'][0], vmax=info['clip'][1])
+"""
+
+import glob
+import re
+
+import numpy as np
+import h5py
+
+import avo_store
+
+#binomial anti-alias filter of the decimation by 2
+WEIGHTS = np.array([1., 4., 6., 4., 1.])/16.
+
+def level_path(base, level):
+    """
+    Path of the file of a level of the pyramid.
+    """
+    return('%s_L%d.h5' % (base, level))
+
+def _decimate(x, axis):
+    """
+    Filters and decimates by 2 along an axis, repeating the edge samples.
+    """
+    x = np.moveaxis(x, axis, 0)
+    n = x.shape[0]
+    pad = np.concatenate([[0, 0], np.arange(n), [n-1, n-1]])
+    x = x[pad]
+    y = sum(w*x[t:t+n:2] for t, w in enumerate(WEIGHTS))
+
+    return(np.moveaxis(y, 0, axis))
+
+def _decimate_block(src, j0, j1):
+    """
+    Decimated inlines j0 to j1 (excluded) of the next level, reading only
+    the inlines of src they need.
+    """
+    n = src.shape[0]
+    rows = np.clip(np.arange(2*j0-2, 2*j1+1), 0, n-1)
+    lo = rows.min()
+    x = np.asarray(src[lo:rows.max()+1], dtype=np.float32)[rows-lo]
+    #inlines, the rows already hold the halo of the filter
+    x = sum(w*x[t:t+2*(j1-j0):2] for t, w in enumerate(WEIGHTS))
+
+    return(_decimate(_decimate(x, 1), 2))
+
+def build_pyramid(base, cubes, il, xl, twt, levels=3, chunk=32,
+                  percentiles=(2, 98), nsamples=1000000):
+    """
+    Builds the levels of the pyramid, in blocks of inlines.
+
+    Parameters
+    ----------
+    base : str
+        Base path of the files of the levels.
+    cubes : dict
+        Full resolution cubes (IL x XL x TWT), arrays, memory maps or HDF5
+        datasets, e.g. {'near': data_n, 'far': data_f, 'fluid': ff}.
+    il : array
+        Inlines.
+    xl : array
+        Crosslines.
+    twt : array
+        Two-way time - ms
+    levels : integer
+        Number of decimated levels (level 0 is the full resolution).
+    chunk : integer
+        Number of inlines of each block.
+    percentiles : tuple
+        Percentiles of the amplitude limits of each cube.
+    nsamples : integer
+        Approximate number of samples used in the percentiles.
+
+    Returns
+    -------
+    paths : list
+        Files of the levels, from the full resolution to the coarsest.
+    """
+    coords = [np.asarray(c) for c in (il, xl, twt)]
+    dims = ('IL', 'XL', 'TWT')
+    paths = []
+    src = cubes
+    clip = {}
+    prev = None
+    try:
+        for level in range(levels+1):
+            path = level_path(base, level)
+            avo_store.create_store(path, {n: dims for n in cubes}, *coords)
+            shape = tuple(c.size for c in coords)
+            step = max(int(np.prod(shape)//nsamples), 1)
+
+            with avo_store.open_writer(path) as f:
+                for name in cubes:
+                    sample = []
+                    for j0 in range(0, shape[0], chunk):
+                        j1 = min(j0+chunk, shape[0])
+                        if level == 0:
+                            block = np.asarray(src[name][j0:j1],
+                                               dtype=np.float32)
+                            sample.append(block.ravel()[::step])
+                        else:
+                            block = _decimate_block(src[name], j0, j1)
+                        avo_store.write_block(f, name, block,
+                                              IL=slice(j0, j1))
+                    if level == 0:
+                        clip[name] = np.nanpercentile(
+                            np.concatenate(sample), percentiles)
+
+            with h5py.File(path, 'r+', libver='latest') as f:
+                f.attrs['level'] = level
+                for name in cubes:
+                    f['cubes/'+name].attrs['clip'] = clip[name]
+            paths.append(path)
+
+            #the next level reads this one
+            if prev is not None:
+                prev.close()
+            prev = h5py.File(path, 'r', libver='latest', swmr=True)
+            src = {name: prev['cubes/'+name] for name in cubes}
+            coords = [c[::2] for c in coords]
+    finally:
+        if prev is not None:
+            prev.close()
+
+    return(paths)
+
+def read_slice(base, name, size=(1024, 1024), as_xarray=False, **sel):
+    """
+    Reads an inline, crossline or time slice from the coarsest level with
+    at least size samples in both axes of the slice (or from the full
+    resolution).
+
+    Parameters
+    ----------
+    base : str
+        Base path of the pyramid.
+    name : str
+        Name of the cube.
+    size : tuple
+        Resolution of the display, e.g. in pixels.
+    as_xarray : bool
+        If True, returns a xarray.DataArray with the coordinates.
+    **sel : value or slice
+        Selection in coordinate values as in avo_store.read_cube: one
+        dimension with a single value and, optionally, slices of the
+        others, e.g. IL=1376, TWT=slice(1900, 2200).
+
+    Returns
+    -------
+    data : array or xarray.DataArray
+        The slice.
+    coords : dict
+        Coordinates of the slice (only if as_xarray is False).
+    info : dict
+        'level' read and 'clip' (amplitude limits of the cube).
+    """
+    paths = glob.glob(glob.escape(base) + '_L*.h5')
+    levels = sorted(int(re.search(r'_L(\d+)\.h5$', p).group(1))
+                    for p in paths)
+    meta = avo_store.read_metadata(level_path(base, 0))['coords']
+
+    #number of samples of the selection at level 0 along the shown axes
+    counts = []
+    for d in ('IL', 'XL', 'TWT'):
+        idx = avo_store.coord_index(meta[d], sel.get(d))
+        if isinstance(idx, slice):
+            counts.append(len(range(*idx.indices(meta[d].size))))
+        elif not isinstance(idx, int):
+            counts.append(len(idx))
+    level = 0
+    for k in levels:
+        if all(c//2**k >= s for c, s in zip(counts, size)):
+            level = k
+
+    path = level_path(base, level)
+    out = avo_store.read_cube(path, name, as_xarray, **sel)
+    with h5py.File(path, 'r', libver='latest', swmr=True) as f:
+        info = {'level': level, 'clip': f['cubes/'+name].attrs['clip']}
+
+    if as_xarray:
+        return(out, info)
+
+    return(out[0], out[1], info)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:40:00 2026
+
+@author: Felipe
+
+Spectral decomposition of the near and far stacks for frequency-dependent
+AVO: iso-frequency near and far cubes from Gaussian filters in the frequency
+domain (Morlet wavelet transform with a fixed number of cycles, or a Gabor
+short-time Fourier transform with a fixed window), and the intercept and
+gradient of each frequency. The filters are computed once, each block of
+inlines needs a single FFT of its traces, and the memory grows with the
+number of frequencies only through the outputs.
+
+    out = specdecomp.spectral_cubes(data_n, data_f, 4., [10., 20., 30.])
+    G_20hz = out['G'][1]
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from balancing import next_pow2
+import ig_attributes as iga
+
+def kernels(freqs, nfft, dt, cycles=6., width=None):
+    """
+    Gaussian filters in the frequency domain, with unit gain at their
+    central frequencies.
+
+    Parameters
+    ----------
+    freqs : array
+        Central frequencies - Hz
+    nfft : integer
+        Length of the FFT.
+    dt : float
+        Sample rate - ms
+    cycles : float
+        Number of cycles of the Morlet wavelet (standard deviation in time
+        of cycles/(2*pi*f)).
+    width : float
+        Standard deviation of the Gaussian window in time of the short-time
+        Fourier transform - ms. If given, replaces cycles.
+
+    Returns
+    -------
+    W : array
+        Filters (frequencies x nfft//2+1).
+    """
+    freqs = np.atleast_1d(np.asarray(freqs, dtype=float))[:, None]
+    f = np.fft.rfftfreq(nfft, dt/1000.)
+    if width is None:
+        sigma_f = freqs/cycles
+    else:
+        sigma_f = np.full(freqs.shape, 1000./(2*np.pi*width))
+
+    return(np.exp(-0.5*((f - freqs)/sigma_f)**2))
+
+def _padding(freqs, dt, cycles, width):
+    """
+    Samples of padding against the wrap-around of the longest filter.
+    """
+    if width is None:
+        width = 1000.*cycles/(2*np.pi*np.min(freqs))
+
+    return(int(np.ceil(3*width/dt)))
+
+def _filter(X, w, nfft, ns, envelope):
+    """
+    Applies one filter to the spectra of the traces.
+    """
+    if not envelope:
+        return(np.fft.irfft(X*w, nfft, axis=-1)[..., :ns])
+    #analytic signal, positive frequencies only
+    spec = np.zeros(X.shape[:-1] + (nfft,), dtype=complex)
+    spec[..., :X.shape[-1]] = X*w
+    spec[..., 1:(nfft+1)//2] *= 2
+
+    return(np.abs(np.fft.ifft(spec, axis=-1)[..., :ns]))
+
+def decompose(traces, freqs, dt, cycles=6., width=None, envelope=False):
+    """
+    Iso-frequency components of a set of traces.
+
+    Parameters
+    ----------
+    traces : array
+        Traces (... x samples).
+    freqs : array
+        Central frequencies - Hz
+    dt : float
+        Sample rate - ms
+    cycles : float
+        Number of cycles of the Morlet wavelet.
+    width : float
+        Window of the short-time Fourier transform - ms, see kernels.
+    envelope : bool
+        If True, the amplitude envelopes instead of the band-limited
+        traces.
+
+    Returns
+    -------
+    comp : array
+        Components (frequencies x ... x samples).
+    """
+    traces = np.asarray(traces, dtype=float)
+    ns = traces.shape[-1]
+    nfft = next_pow2(ns + _padding(freqs, dt, cycles, width))
+    W = kernels(freqs, nfft, dt, cycles, width)
+    X = np.fft.rfft(traces, nfft, axis=-1)
+
+    comp = np.empty((W.shape[0],) + traces.shape)
+    for k, w in enumerate(W):
+        comp[k] = _filter(X, w, nfft, ns, envelope)
+
+    return(comp)
+
+def spectral_cubes(near, far, dt, freqs, angle_n=5., angle_f=25.,
+                   cycles=6., width=None, chunk=32, out=None, workers=None):
+    """
+    Computes the iso-frequency near and far stacks and their intercept and
+    gradient in blocks of inlines.
+
+    Parameters
+    ----------
+    near : array
+        Near stack (IL x XL x TWT), a NumPy array, a memory map or an HDF5
+        dataset.
+    far : array
+        Far stack (IL x XL x TWT).
+    dt : float
+        Sample rate - ms
+    freqs : array
+        Central frequencies - Hz
+    angle_n : float
+        Mean angle of the near stack - degrees
+    angle_f : float
+        Mean angle of the far stack - degrees
+    cycles : float
+        Number of cycles of the Morlet wavelet.
+    width : float
+        Window of the short-time Fourier transform - ms, see kernels.
+    chunk : integer
+        Number of inlines of each block.
+    out : dict
+        Output arrays 'near', 'far', 'I' and 'G' (frequencies x IL x XL x
+        TWT), e.g. memory maps or HDF5 datasets; the missing ones are not
+        computed. If None, all of them are created in memory (float32).
+    workers : integer
+        Number of threads.
+
+    Returns
+    -------
+    out : dict
+        The output arrays, out['G'][k] is the gradient at freqs[k].
+    """
+    freqs = np.atleast_1d(np.asarray(freqs, dtype=float))
+    nil, nxl, ns = near.shape
+    if out is None:
+        out = {name: np.zeros((freqs.size,) + near.shape, dtype=np.float32)
+               for name in ('near', 'far', 'I', 'G')}
+
+    nfft = next_pow2(ns + _padding(freqs, dt, cycles, width))
+    W = kernels(freqs, nfft, dt, cycles, width)
+
+    def block(start):
+        sl = slice(start, min(start+chunk, nil))
+        N = np.fft.rfft(np.asarray(near[sl], dtype=float), nfft, axis=-1)
+        F = np.fft.rfft(np.asarray(far[sl], dtype=float), nfft, axis=-1)
+        #one frequency at a time, so a block holds a single component
+        for k, w in enumerate(W):
+            n = _filter(N, w, nfft, ns, False)
+            f = _filter(F, w, nfft, ns, False)
+            I, G = iga.intercept_gradient(n, f, angle_n, angle_f)
+            for name, x in (('near', n), ('far', f), ('I', I), ('G', G)):
+                if name in out:
+                    out[name][k, sl] = x
+
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        list(pool.map(block, range(0, nil, chunk)))
+
+    return(out)
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:45:00 2026
+
+@author: Felipe
+
+Statistical wavelet extraction from the angle stacks around a well: the
+amplitude spectrum is the average of the autocorrelation spectra of the
+traces in a window, computed with one batched FFT over the subvolume, and
+the wavelet is zero-phase or rotated to a constant phase.
+"""
+
+import numpy as np
+
+def extract_traces(cube, inlines, crosslines, twt, il, xl, radius=5,
+                   tmin=None, tmax=None):
+    """
+    Extracts the traces around a location.
+
+    Parameters
+    ----------
+    cube : 3D array
+        Stack (IL x XL x TWT), e.g. data_n or near.values of the notebooks.
+    inlines : array
+        Inlines of the cube.
+    crosslines : array
+        Crosslines of the cube.
+    twt : array
+        Two-way time of the cube - ms
+    il : float
+        Inline of the well, e.g. well2_il.
+    xl : float
+        Crossline of the well, e.g. well2_xl.
+    radius : integer
+        Half size of the square of traces, in traces.
+    tmin : float
+        Top of the time window - ms. If None, the first sample.
+    tmax : float
+        Base of the time window - ms. If None, the last sample.
+
+    Returns
+    -------
+    traces : 2D array
+        Traces (traces x samples).
+    """
+    i = int(np.abs(np.asarray(inlines) - il).argmin())
+    j = int(np.abs(np.asarray(crosslines) - xl).argmin())
+    k0 = 0 if tmin is None else int(np.searchsorted(twt, tmin))
+    k1 = len(twt) if tmax is None else int(np.searchsorted(twt, tmax,
+                                                           side='right'))
+
+    sub = cube[max(i-radius, 0):i+radius+1, max(j-radius, 0):j+radius+1,
+               k0:k1]
+    traces = np.reshape(sub, (-1, sub.shape[-1]))
+
+    return(traces)
+
+def hilbert(x, axis=-1):
+    """
+    Hilbert transform (imaginary part of the analytic signal) with FFT.
+
+    Parameters
+    ----------
+    x : array
+        Traces or wavelets.
+    axis : integer
+        Axis of the samples.
+
+    Returns
+    -------
+    h : array
+        Hilbert transform of x, same shape.
+    """
+    n = x.shape[axis]
+    spec = np.fft.fft(x, axis=axis)
+    h = np.zeros(n)
+    h[0] = 1
+    if n % 2 == 0:
+        h[n//2] = 1
+        h[1:n//2] = 2
+    else:
+        h[1:(n+1)//2] = 2
+    shape = [1]*x.ndim
+    shape[axis] = n
+
+    return(np.fft.ifft(spec*h.reshape(shape), axis=axis).imag)
+
+def rotate_phase(w, phase):
+    """
+    Constant phase rotation.
+
+    Parameters
+    ----------
+    w : array
+        Wavelet or traces (rotation along the last axis).
+    phase : float or array
+        Phase in degrees. An array of phases returns one rotation for each
+        phase in the first axis.
+
+    Returns
+    -------
+    rotated : array
+        Rotated wavelet(s).
+    """
+    w = np.asarray(w, dtype=float)
+    phase = np.radians(phase)
+    h = hilbert(w)
+    if np.ndim(phase) == 0:
+        return(np.cos(phase)*w - np.sin(phase)*h)
+    shape = (-1,) + (1,)*w.ndim
+
+    return(np.cos(phase).reshape(shape)*w - np.sin(phase).reshape(shape)*h)
+
+def _power(traces, taper=True):
+    """
+    Autocorrelation (power) spectrum of each trace, with one batched FFT.
+    """
+    traces = np.asarray(traces, dtype=float)
+    traces = traces - traces.mean(axis=-1, keepdims=True)
+    if taper:
+        traces = traces*np.hanning(traces.shape[-1])
+
+    return(np.abs(np.fft.rfft(traces, axis=-1))**2)
+
+def _zero_phase(power, ns, dt, length, taper=True):
+    """
+    Zero-phase wavelet(s) from average power spectra (along the last axis).
+    """
+    #real spectrum, the wavelet is centered after the shift
+    w = np.fft.fftshift(np.fft.irfft(np.sqrt(power), ns, axis=-1), axes=-1)
+
+    half = int(round(length/dt/2.))
+    c = ns//2
+    w = w[..., max(c-half, 0):c+half+1]
+    if taper:
+        w = w*np.hanning(w.shape[-1]+2)[1:-1]
+    w = w/np.max(np.abs(w), axis=-1, keepdims=True)
+    time = (np.arange(w.shape[-1]) - min(half, c))*dt
+
+    return(time, w)
+
+def statistical_wavelet(traces, dt, length=128., taper=True):
+    """
+    Computes the zero-phase wavelet with the average amplitude spectrum of
+    the traces (square root of the average autocorrelation spectrum).
+
+    Parameters
+    ----------
+    traces : 2D array
+        Traces (traces x samples), e.g. from extract_traces.
+    dt : float
+        Sample rate - ms
+    length : float
+        Length of the wavelet - ms
+    taper : bool
+        If True, a Hann taper is applied to the traces and to the wavelet.
+
+    Returns
+    -------
+    time : array
+        Time of the wavelet - ms
+    wavelet : array
+        Zero-phase wavelet with maximum amplitude 1.
+    """
+    power = _power(traces, taper).mean(axis=0)
+
+    return(_zero_phase(power, np.shape(traces)[-1], dt, length, taper))
+
+def estimate_phase(traces, phases=np.arange(-90, 91, 5)):
+    """
+    Estimates a constant phase of the wavelet by maximum kurtosis: the
+    traces rotated by minus the right phase are the spikiest (White, 1988).
+    All the phases are tested at once.
+
+    Parameters
+    ----------
+    traces : 2D array
+        Traces (traces x samples).
+    phases : array
+        Phases tested - degrees
+
+    Returns
+    -------
+    phase : float
+        Phase with the largest kurtosis - degrees
+    kurtosis : array
+        Kurtosis of the rotated traces for each phase.
+    """
+    rotated = rotate_phase(traces, -np.asarray(phases, dtype=float))
+    x = rotated - rotated.mean(axis=-1, keepdims=True)
+    m2 = np.mean(x**2, axis=(-2, -1))
+    m4 = np.mean(x**4, axis=(-2, -1))
+    kurtosis = m4/m2**2
+    phase = float(np.asarray(phases)[np.argmax(kurtosis)])
+
+    return(phase, kurtosis)
+
+def well_wavelets(near, far, inlines, crosslines, twt, wells, radius=5,
+                  tmin=None, tmax=None, length=128., phase=0.):
+    """
+    Near and far wavelets for several wells, with a single FFT for all the
+    traces of all the wells.
+
+    Parameters
+    ----------
+    near : 3D array
+        Near stack (IL x XL x TWT).
+    far : 3D array
+        Far stack (IL x XL x TWT).
+    inlines : array
+        Inlines of the stacks.
+    crosslines : array
+        Crosslines of the stacks.
+    twt : array
+        Two-way time - ms
+    wells : dict
+        (inline, crossline) of each well, e.g. {'well2': (1376, 1776)}.
+    radius : integer
+        Half size of the square of traces around each well.
+    tmin : float
+        Top of the time window - ms
+    tmax : float
+        Base of the time window - ms
+    length : float
+        Length of the wavelets - ms
+    phase : float or str
+        Constant phase of the wavelets in degrees, or 'kurtosis' to
+        estimate it with estimate_phase for each well and stack.
+
+    Returns
+    -------
+    time : array
+        Time of the wavelets - ms
+    wavelets : dict
+        (near wavelet, far wavelet) of each well.
+    """
+    dt = float(twt[1] - twt[0])
+    names = list(wells)
+    traces = {}
+    waves = {}
+    for key, cube in (('near', near), ('far', far)):
+        traces[key] = [extract_traces(cube, inlines, crosslines, twt,
+                                      *wells[n], radius=radius, tmin=tmin,
+                                      tmax=tmax) for n in names]
+        #one FFT for the traces of all the wells, then the average of each
+        #well (wells close to the border have less traces)
+        counts = np.array([len(t) for t in traces[key]])
+        power = _power(np.concatenate(traces[key]))
+        power = np.add.reduceat(power, np.cumsum(counts) - counts, axis=0)
+        power /= counts[:, None]
+        ns = traces[key][0].shape[-1]
+        time, waves[key] = _zero_phase(power, ns, dt, length)
+
+    wavelets = {}
+    for i, n in enumerate(names):
+        pair = []
+        for key in ('near', 'far'):
+            w = waves[key][i]
+            p = estimate_phase(traces[key][i])[0] if phase == 'kurtosis' \
+                else phase
+            pair.append(rotate_phase(w, p) if p else w)
+        wavelets[n] = tuple(pair)
+
+    return(time, wavelets)
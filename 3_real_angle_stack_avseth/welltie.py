@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:10:00 2026
+
+@author: Felipe
+
+Well tie: bulk time shift, constant phase rotation and stretch/squeeze of
+the synthetic (e.g. a column of avo.shueyrc convolved with the wavelet) that
+maximize the correlation with the seismic trace at the well. The whole grid
+of candidates is evaluated at once: the stretched synthetics are resampled
+together, all lags come from one FFT cross-correlation, and the phase
+rotation is a linear combination of the cross-correlations of the synthetic
+and of its Hilbert transform,
+
+    xc(phase) = cos(phase)*xc(s, d) - sin(phase)*xc(H(s), d)
+"""
+
+import numpy as np
+
+from wavelet import hilbert, rotate_phase
+
+def stretch(trace, factors, center=None):
+    """
+    Stretches (factor > 1) or squeezes (factor < 1) a trace around a
+    sample, with linear interpolation. All the factors at once.
+
+    Parameters
+    ----------
+    trace : array
+        Trace (samples).
+    factors : array
+        Stretch factors.
+    center : float
+        Sample kept fixed. If None, the middle of the trace.
+
+    Returns
+    -------
+    stretched : 2D array
+        Stretched traces (factors x samples), zero outside of the trace.
+    """
+    trace = np.asarray(trace, dtype=float)
+    ns = trace.size
+    center = (ns-1)/2. if center is None else center
+
+    pos = center + (np.arange(ns) - center)/np.asarray(factors,
+                                                      dtype=float)[:, None]
+    i0 = np.floor(pos).astype(int)
+    w = pos - i0
+    inside = (i0 >= 0) & (i0 < ns-1)
+    i0 = np.clip(i0, 0, ns-2)
+    stretched = np.where(inside, (1-w)*trace[i0] + w*trace[i0+1], 0.)
+    #the last sample is inside the trace
+    stretched[pos == ns-1] = trace[-1]
+
+    return(stretched)
+
+def xcorr(a, b, maxlag):
+    """
+    Cross-correlation of the traces a with the trace b by FFT, for lags
+    from -maxlag to maxlag samples. A positive lag delays a.
+
+    Parameters
+    ----------
+    a : array
+        Traces (... x samples).
+    b : array
+        Trace (samples).
+    maxlag : integer
+        Largest lag in samples.
+
+    Returns
+    -------
+    xc : array
+        Cross-correlation (... x 2*maxlag+1).
+    """
+    ns = np.shape(a)[-1]
+    nfft = 1 << int(np.ceil(np.log2(2*ns - 1)))
+    spec = np.conj(np.fft.rfft(a, nfft, axis=-1))*np.fft.rfft(b, nfft)
+    xc = np.fft.irfft(spec, nfft, axis=-1)
+    xc = np.concatenate([xc[..., nfft-maxlag:], xc[..., :maxlag+1]], axis=-1)
+
+    return(xc)
+
+def welltie(synthetic, seismic, dt, max_shift=40.,
+            phases=np.arange(-180, 180, 5),
+            stretches=np.linspace(0.95, 1.05, 11)):
+    """
+    Searches the bulk shift, constant phase and stretch that maximize the
+    normalized correlation between the synthetic and the seismic trace.
+
+    Parameters
+    ----------
+    synthetic : array
+        Synthetic trace, in the same time samples of the seismic trace.
+    seismic : array
+        Seismic trace at the well, e.g. near.sel(IL=well2_il, XL=well2_xl).
+    dt : float
+        Sample rate - ms
+    max_shift : float
+        Largest bulk shift tested - ms
+    phases : array
+        Phase rotations tested - degrees
+    stretches : array
+        Stretch factors tested (1 is no stretch).
+
+    Returns
+    -------
+    tie : dict
+        'shift' (ms, positive delays the synthetic), 'phase' (degrees),
+        'stretch', 'corr' (best normalized correlation), 'synthetic' (tied
+        synthetic), and the grid: 'surface' (stretches x phases x shifts),
+        'shifts' (ms), 'phases' and 'stretches'.
+    """
+    s = np.nan_to_num(np.asarray(synthetic, dtype=float))
+    d = np.nan_to_num(np.asarray(seismic, dtype=float))
+    phases = np.asarray(phases, dtype=float)
+    stretches = np.asarray(stretches, dtype=float)
+    maxlag = int(round(max_shift/dt))
+
+    S = stretch(s, stretches) #(stretches x samples)
+    H = hilbert(S)
+    xc = xcorr(np.stack([S, H]), d, maxlag) #(2 x stretches x lags)
+
+    #energy of the rotated synthetics, exact for any phase
+    p = np.radians(phases)[:, None]
+    c, si = np.cos(p), np.sin(p)
+    ess, ehh, esh = (S*S).sum(-1), (H*H).sum(-1), (S*H).sum(-1)
+    energy = c**2*ess - 2*c*si*esh + si**2*ehh #(phases x stretches)
+
+    surface = c[..., None]*xc[0][None] - si[..., None]*xc[1][None]
+    norm = np.sqrt(np.maximum(energy, 1e-30)*(d*d).sum())
+    surface = surface/norm[..., None]
+    surface = np.transpose(surface, (1, 0, 2))
+
+    i, j, k = np.unravel_index(np.argmax(surface), surface.shape)
+    lag = k - maxlag
+    tied = np.roll(rotate_phase(S[i], phases[j]), lag)
+    if lag > 0:
+        tied[:lag] = 0
+    elif lag < 0:
+        tied[lag:] = 0
+
+    tie = {'shift': lag*dt, 'phase': phases[j], 'stretch': stretches[i],
+           'corr': surface[i, j, k], 'synthetic': tied, 'surface': surface,
+           'shifts': np.arange(-maxlag, maxlag+1)*dt, 'phases': phases,
+           'stretches': stretches}
+
+    return(tie)